@@ -1,5 +1,7 @@
 import streamlit as st
 import os
+import threading
+from concurrent.futures import Future
 from dotenv import load_dotenv
 import pandas as pd
 
@@ -25,101 +27,162 @@ if 'initialized' not in st.session_state:
     st.session_state.query_engine = None
     st.session_state.initializing = False
 
-def initialize_system():
-    """Initialize the entire system"""
-    with st.spinner("Initializing system..."):
-        # Step 1: Create components
-        client = DataGovInClient()
-        catalog = DatasetCatalog()
-        fetcher = DataFetcher()
-        cleaner = DataCleaner()
-        data_store = DataStore()
-        
-        # Step 2: Discover datasets
-        st.info("Discovering datasets from data.gov.in...")
-        catalog.discover_datasets(client)
-        
-        # Step 3: Fetch and load key datasets
-        st.info("Fetching and processing datasets...")
-        for category, subcats in catalog.datasets.items():
-            for subcat, info in subcats.items():
-                for resource_info in info['resource_ids'][:2]:  # Load first 2 of each
-                    try:
-                        df = fetcher.fetch_dataset(resource_info['id'])
-                        if not df.empty:
-                            cleaned_df = cleaner.clean_dataset(df, category)
-                            data_store.add_dataset(
-                                category,
-                                subcat,
-                                cleaned_df,
-                                resource_info
-                            )
-                    except Exception as e:
-                        st.warning(f"Could not load {resource_info['name']}: {e}")
+def _snapshot_config(cfg) -> dict:
+    """Settings a saved snapshot depends on; a snapshot saved under other values is not reused."""
+    return {
+        "has_api_key": bool(cfg.data_gov_in_api_key),
+        "crop_production_resource_id": cfg.crop_production_resource_id,
+        "district_crop_production_resource_id": cfg.district_crop_production_resource_id,
+        "rainfall_resource_id": cfg.rainfall_resource_id,
+    }
 
-        # Step 3b: Explicitly ensure key agriculture resources are loaded by ID
-        try:
-            cfg = get_config()
-            # a) All India Area Production Yield Major Crops
-            if cfg.crop_production_resource_id:
+
+def load_data_store(warnings: list) -> DataStore:
+    """Discover, fetch and clean the datasets; problems are appended to `warnings`.
+
+    Runs without Streamlit calls so it can execute on the prewarm thread.
+    A fresh parquet snapshot from an earlier run skips all of it.
+    """
+    cfg = get_config()
+    snapshot = DataStore.load_snapshot(cfg.snapshot_dir, cfg.snapshot_ttl, _snapshot_config(cfg))
+    if snapshot is not None:
+        return snapshot
+
+    # Step 1: Create components
+    client = DataGovInClient()
+    catalog = DatasetCatalog()
+    fetcher = DataFetcher()
+    cleaner = DataCleaner()
+    data_store = DataStore()
+
+    # Step 2: Discover datasets
+    catalog.discover_datasets(client)
+
+    # Step 3: Fetch and load key datasets
+    for category, subcats in catalog.datasets.items():
+        for subcat, info in subcats.items():
+            for resource_info in info['resource_ids'][:2]:  # Load first 2 of each
                 try:
-                    df_major = fetcher.fetch_dataset(cfg.crop_production_resource_id)
-                    if not df_major.empty:
-                        cleaned_major = cleaner.clean_dataset(df_major, 'agriculture')
+                    df = fetcher.fetch_dataset(resource_info['id'])
+                    if not df.empty:
+                        cleaned_df = cleaner.clean_dataset(df, category)
                         data_store.add_dataset(
-                            'agriculture',
-                            'crop_production_major_crops',
-                            cleaned_major,
-                            {'id': cfg.crop_production_resource_id, 'name': 'All India Area Production Yield Major Crops'}
+                            category,
+                            subcat,
+                            cleaned_df,
+                            resource_info
                         )
                 except Exception as e:
-                    st.warning(f"Could not load major crops dataset: {e}")
-            
-            # b) District-wise Season-wise Crop Production (with auto-discovery fallback)
-            district_resource_ids_to_try = []
-            if cfg.district_crop_production_resource_id:
-                district_resource_ids_to_try.append(cfg.district_crop_production_resource_id)
-            
-            # Try auto-discovery if configured ID fails or is missing
+                    warnings.append(f"Could not load {resource_info['name']}: {e}")
+
+    # Step 3b: Explicitly ensure key agriculture resources are loaded by ID
+    try:
+        cfg = get_config()
+        # a) All India Area Production Yield Major Crops
+        if cfg.crop_production_resource_id:
             try:
-                # Use the client already created at the top of initialize_system
-                discovered_district_id = client.discover_district_crop_production_resource_id()
-                if discovered_district_id and discovered_district_id not in district_resource_ids_to_try:
-                    district_resource_ids_to_try.append(discovered_district_id)
-            except Exception:
-                pass
-            
-            # Try each resource ID until we find a valid one
-            district_loaded = False
-            for resource_id in district_resource_ids_to_try:
-                try:
-                    df_district = fetcher.fetch_dataset(resource_id)
-                    if not df_district.empty:
-                        # Quick schema check - look for required columns
-                        df_cols_lower = [c.lower() for c in df_district.columns]
-                        has_state = any('state' in c for c in df_cols_lower)
-                        has_district = any('district' in c for c in df_cols_lower)
-                        has_crop = any('crop' in c for c in df_cols_lower)
-                        has_production = any('production' in c or 'prodn' in c or 'prod' in c for c in df_cols_lower)
-                        
-                        if has_state and has_district and has_crop and has_production:
-                            cleaned_district = cleaner.clean_dataset(df_district, 'agriculture')
-                            data_store.add_dataset(
-                                'agriculture',
-                                'crop_production_district_season',
-                                cleaned_district,
-                                {'id': resource_id, 'name': 'District-wise Season-wise Crop Production'}
-                            )
-                            district_loaded = True
-                            break
-                except Exception as e:
-                    # Try next resource ID
-                    continue
-            
-            if not district_loaded and district_resource_ids_to_try:
-                st.warning("Could not load district crop production dataset. The resource ID(s) may be incorrect or the dataset may be unavailable.")
-        except Exception as e:
-            st.warning(f"Could not ensure agriculture resources by ID: {e}")
+                df_major = fetcher.fetch_dataset(cfg.crop_production_resource_id)
+                if not df_major.empty:
+                    cleaned_major = cleaner.clean_dataset(df_major, 'agriculture')
+                    data_store.add_dataset(
+                        'agriculture',
+                        'crop_production_major_crops',
+                        cleaned_major,
+                        {'id': cfg.crop_production_resource_id, 'name': 'All India Area Production Yield Major Crops'}
+                    )
+            except Exception as e:
+                warnings.append(f"Could not load major crops dataset: {e}")
+
+        # b) District-wise Season-wise Crop Production (with auto-discovery fallback)
+        district_resource_ids_to_try = []
+        if cfg.district_crop_production_resource_id:
+            district_resource_ids_to_try.append(cfg.district_crop_production_resource_id)
+
+        # Try auto-discovery if configured ID fails or is missing
+        try:
+            # Use the client already created at the top of load_data_store
+            discovered_district_id = client.discover_district_crop_production_resource_id()
+            if discovered_district_id and discovered_district_id not in district_resource_ids_to_try:
+                district_resource_ids_to_try.append(discovered_district_id)
+        except Exception:
+            pass
+
+        # Try each resource ID until we find a valid one
+        district_loaded = False
+        for resource_id in district_resource_ids_to_try:
+            try:
+                df_district = fetcher.fetch_dataset(resource_id)
+                if not df_district.empty:
+                    # Quick schema check - look for required columns
+                    df_cols_lower = [c.lower() for c in df_district.columns]
+                    has_state = any('state' in c for c in df_cols_lower)
+                    has_district = any('district' in c for c in df_cols_lower)
+                    has_crop = any('crop' in c for c in df_cols_lower)
+                    has_production = any('production' in c or 'prodn' in c or 'prod' in c for c in df_cols_lower)
+
+                    if has_state and has_district and has_crop and has_production:
+                        cleaned_district = cleaner.clean_dataset(df_district, 'agriculture')
+                        data_store.add_dataset(
+                            'agriculture',
+                            'crop_production_district_season',
+                            cleaned_district,
+                            {'id': resource_id, 'name': 'District-wise Season-wise Crop Production'}
+                        )
+                        district_loaded = True
+                        break
+            except Exception as e:
+                # Try next resource ID
+                continue
+
+        if not district_loaded and district_resource_ids_to_try:
+            warnings.append("Could not load district crop production dataset. The resource ID(s) may be incorrect or the dataset may be unavailable.")
+    except Exception as e:
+        warnings.append(f"Could not ensure agriculture resources by ID: {e}")
+
+    # Only a complete load is worth reusing: a partial one would hide the failure until the snapshot expires
+    key_datasets = ['crop_production_major_crops'] if cfg.crop_production_resource_id else []
+    if cfg.district_crop_production_resource_id:
+        key_datasets.append('crop_production_district_season')
+    complete = not warnings and all(data_store.get_table(name) is not None for name in key_datasets)
+    if cfg.snapshot_ttl > 0 and complete:
+        data_store.save_snapshot(cfg.snapshot_dir, _snapshot_config(cfg))
+    return data_store
+
+
+def _run_load(future: Future) -> None:
+    warnings = []
+    try:
+        future.set_result((load_data_store(warnings), warnings))
+    except BaseException as e:
+        future.set_exception(e)
+
+
+@st.cache_resource(show_spinner=False)
+def prewarm() -> Future:
+    """Start loading the data store on a background thread, once per server process.
+
+    Every session shares the result, so the first question doesn't pay for
+    discovery and fetching inline.
+    """
+    future = Future()
+    threading.Thread(target=_run_load, args=(future,), name="prewarm", daemon=True).start()
+    return future
+
+
+prewarm()
+
+def initialize_system():
+    """Initialize the entire system"""
+    with st.spinner("Initializing system..."):
+        # Steps 1-3 run on the prewarm thread; wait for them here
+        try:
+            data_store, warnings = prewarm().result()
+        except Exception:
+            # Don't pin a failed load; the next attempt starts a fresh one
+            prewarm.clear()
+            raise
+        for warning in warnings:
+            st.warning(warning)
         
         # Step 4: Initialize query engine
         llm_client = LLMClient()
@@ -427,11 +490,9 @@ def main():
                             from llm_integration.prompt_templates import PromptTemplates
                             templates = PromptTemplates()
                             answer_prompt = templates.answer_synthesis_prompt(question, results)
-                            # Pass results directly for better error handling
-                            answer = llm.generate_response(answer_prompt, results=results)
-                            
                             st.subheader("Answer")
-                            st.markdown(answer)
+                            # Pass results directly for better error handling; render tokens as they arrive
+                            st.write_stream(llm.generate_response_stream(answer_prompt, results=results))
                         
                     except Exception as e:
                         st.error(f"Error processing query: {e}")
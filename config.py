@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 
 from pathlib import Path
 from dotenv import load_dotenv, find_dotenv
@@ -25,9 +26,17 @@ class AppConfig:
     crop_production_resource_id: str | None
     district_crop_production_resource_id: str | None
     rainfall_resource_id: str | None
+    # On-disk cache for fetched datasets (TTL in seconds; 0 disables it)
+    data_cache_dir: str
+    data_cache_ttl: int
+    # Parquet snapshot of the loaded DataStore for fast restarts (max age in seconds; 0 disables it)
+    snapshot_dir: str
+    snapshot_ttl: int
 
 
+@lru_cache(maxsize=1)
 def get_config() -> AppConfig:
+    """Settings read from the environment once per process (call `get_config.cache_clear()` to reload)."""
     return AppConfig(
         data_gov_in_api_key=os.getenv("DATA_GOV_IN_API_KEY"),
         openai_api_key=os.getenv("OPENAI_API_KEY"),
@@ -41,6 +50,10 @@ def get_config() -> AppConfig:
             "3b01bcb8-0b14-4abf-b6f2-c1bfd384ba69",
         ),
         rainfall_resource_id=os.getenv("RAINFALL_RESOURCE_ID"),
+        data_cache_dir=os.getenv("DATA_CACHE_DIR", ".cache/data_gov"),
+        data_cache_ttl=int(os.getenv("DATA_CACHE_TTL", "3600")),
+        snapshot_dir=os.getenv("DATA_SNAPSHOT_DIR", "~/.cache/mlchatbot"),
+        snapshot_ttl=int(os.getenv("DATA_SNAPSHOT_TTL", "3600")),
     )
 
 
@@ -1,9 +1,91 @@
 import os
-from typing import Dict, List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
 
 import requests
 from typing import Optional
 
+from utils import fast_json
+from utils.cache import ttl_cache
+from utils.http import (
+    READ_ERRORS,
+    RETRY_STATUSES,
+    backoff_delay,
+    rate_limit_pause,
+    request_timeout,
+    shared_http2_client,
+    shared_session,
+)
+
+
+# Resource IDs rarely change within a session; remember discovery results for an hour
+_DISCOVERY_TTL_SECONDS = 3600
+
+# Failed discoveries (None) are usually transient; retry them after a minute
+_DISCOVERY_MISS_TTL_SECONDS = 60
+
+# Attempts per CKAN action on errors the session doesn't retry itself
+_CKAN_ATTEMPTS = 4
+
+# Static catalogs returned by the `list_*` helpers (shared; treat as read-only)
+_SAMPLE_RESOURCES: Dict[str, Dict[str, List[Dict]]] = {
+    "agriculture": {
+        "crop_production": {
+            "resource_ids": [
+                {"id": "sample_agri_1", "name": "Crop Production (sample)"},
+            ]
+        }
+    },
+    "climate": {"rainfall": {"resource_ids": []}},
+}
+
+_CURATED_REAL_RESOURCES: Dict[str, Dict[str, List[Dict]]] = {
+    "agriculture": {
+        "crop_production": {
+            "resource_ids": [
+                {
+                    "id": "9ef84268-d588-465a-a308-a864a43d0070",
+                    "name": "Crop Production in India (All-India)",
+                }
+            ]
+        }
+    },
+    "climate": {"rainfall": {"resource_ids": []}},
+}
+
+
+# Resource formats the fetchers can parse
+_OK_FORMATS = frozenset({"json", "csv"})
+
+
+def _first_resource_id(packages: List[Dict], accept: Optional[Callable[[Dict], bool]] = None) -> Optional[str]:
+    """ID of the first JSON/CSV resource among `packages` (optionally only those `accept`ed)."""
+    return next(
+        (
+            rid
+            for pkg in packages
+            if accept is None or accept(pkg)
+            for res in pkg.get("resources", ())
+            if (res.get("format") or "").lower() in _OK_FORMATS
+            for rid in (res.get("id") or res.get("resource_id"),)
+            if rid
+        ),
+        None,
+    )
+
+
+def _is_district_package(pkg: Dict) -> bool:
+    """District-level package that isn't one of the similarly named air-quality sets."""
+    title = (pkg.get("title") or "").lower()
+    name = (pkg.get("name") or "").lower()
+    return ("district" in title or "district" in name) and "pollutant" not in title and "air" not in title
+
+
+def _client_key(client: "DataGovInClient"):
+    """Discovery results depend only on the endpoint and credentials."""
+    return (client.base_url, client.api_key)
+
 
 class DataGovInClient:
     """Minimal client placeholder for data.gov.in CKAN API.
@@ -21,6 +103,23 @@ class DataGovInClient:
             from config import get_config
             cfg = get_config()
             self.api_key = cfg.data_gov_in_api_key or os.getenv("DATA_GOV_IN_API_KEY")
+        # Connections are pooled process-wide; only the API key is per client.
+        # Prefer HTTP/2 so the discovery burst shares one multiplexed connection.
+        http2 = shared_http2_client()
+        self._session = http2 if http2 is not None else shared_session()
+        # The requests session's adapter already retries 429/5xx; httpx does not
+        self._retry_statuses = http2 is not None
+        self._headers = {"api-key": self.api_key} if self.api_key else {}
+        self._timeout = request_timeout(self._session, read=60)
+
+    def close(self) -> None:
+        """Kept for symmetry; the shared session outlives any one client."""
+
+    def __enter__(self) -> "DataGovInClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
 
     def ping(self) -> bool:
         """Lightweight health check; always returns True in stub mode."""
@@ -38,52 +137,60 @@ class DataGovInClient:
             }
         }
         """
-        return {
-            "agriculture": {
-                "crop_production": {
-                    "resource_ids": [
-                        {"id": "sample_agri_1", "name": "Crop Production (sample)"},
-                    ]
-                }
-            },
-            "climate": {"rainfall": {"resource_ids": []}},
-        }
+        return _SAMPLE_RESOURCES
 
     def list_curated_real_resources(self) -> Dict[str, Dict[str, List[Dict]]]:
         """Return a curated set of real data.gov.in resource IDs.
 
         Note: Accessing these via API requires DATA_GOV_IN_API_KEY.
         """
-        return {
-            "agriculture": {
-                "crop_production": {
-                    "resource_ids": [
-                        {
-                            "id": "9ef84268-d588-465a-a308-a864a43d0070",
-                            "name": "Crop Production in India (All-India)",
-                        }
-                    ]
-                }
-            },
-            "climate": {"rainfall": {"resource_ids": []}},
-        }
+        return _CURATED_REAL_RESOURCES
 
     # -------- Auto-discovery (best-effort) --------
     def _ckan_action(self, action: str, params: Dict) -> Optional[Dict]:
-        """Call CKAN action API, return JSON or None on failure."""
-        try:
-            # CKAN action endpoint
-            url = f"https://data.gov.in/api/1/action/{action}"
-            headers = {}
-            if self.api_key:
-                headers["api-key"] = self.api_key
-            resp = requests.get(url, params=params, headers=headers, timeout=60)
-            if resp.ok:
-                return resp.json()
-            return None
-        except Exception:
-            return None
+        """Call CKAN action API, return JSON or None on failure.
+
+        429/5xx responses are retried with backoff (by the session adapter
+        for requests, here for httpx). Connect failures are left to the
+        transport's own retries, so only errors it doesn't retry (a body
+        cut off mid-read, an httpx read timeout) are retried here. When the
+        rate-limit headers show the quota is nearly used up, the call
+        pauses before returning so the next search doesn't get throttled.
+        """
+        # CKAN action endpoint
+        url = f"https://data.gov.in/api/1/action/{action}"
+        for attempt in range(_CKAN_ATTEMPTS):
+            last_attempt = attempt == _CKAN_ATTEMPTS - 1
+            try:
+                resp = self._session.get(url, params=params, headers=self._headers, timeout=self._timeout)
+            except READ_ERRORS:
+                if last_attempt:
+                    return None
+                time.sleep(backoff_delay(attempt))
+                continue
+            except Exception:
+                return None
 
+            pause = rate_limit_pause(resp)
+            if self._retry_statuses and resp.status_code in RETRY_STATUSES and not last_attempt:
+                time.sleep(pause or backoff_delay(attempt))
+                continue
+            if pause:
+                time.sleep(pause)
+            if resp.status_code >= 400:
+                return None
+            try:
+                return fast_json.loads(resp.content)
+            except ValueError:
+                return None
+        return None
+
+    def _package_search_many(self, paramsets: List[Dict]) -> List[Optional[Dict]]:
+        """Issue several `package_search` calls concurrently; results keep input order."""
+        with ThreadPoolExecutor(max_workers=max(1, len(paramsets))) as pool:
+            return list(pool.map(lambda params: self._ckan_action("package_search", params), paramsets))
+
+    @ttl_cache(maxsize=8, ttl=_DISCOVERY_TTL_SECONDS, key=_client_key, none_ttl=_DISCOVERY_MISS_TTL_SECONDS)
     def discover_rainfall_resource_id(self) -> Optional[str]:
         """Try to find an IMD rainfall dataset resource ID automatically."""
         # Search for packages mentioning rainfall from IMD
@@ -98,15 +205,9 @@ class DataGovInClient:
         if not data or not data.get("success"):
             return None
 
-        for pkg in data.get("result", {}).get("results", []):
-            for res in pkg.get("resources", []):
-                fmt = (res.get("format") or "").lower()
-                if fmt in {"json", "csv"}:
-                    rid = res.get("id") or res.get("resource_id")
-                    if rid:
-                        return rid
-        return None
+        return _first_resource_id(data.get("result", {}).get("results", []))
 
+    @ttl_cache(maxsize=8, ttl=_DISCOVERY_TTL_SECONDS, key=_client_key, none_ttl=_DISCOVERY_MISS_TTL_SECONDS)
     def discover_crop_production_resource_id(self) -> Optional[str]:
         """Try to find MoAFW crop production dataset resource ID automatically."""
         data = self._ckan_action(
@@ -119,15 +220,9 @@ class DataGovInClient:
         )
         if not data or not data.get("success"):
             return None
-        for pkg in data.get("result", {}).get("results", []):
-            for res in pkg.get("resources", []):
-                fmt = (res.get("format") or "").lower()
-                if fmt in {"json", "csv"}:
-                    rid = res.get("id") or res.get("resource_id")
-                    if rid:
-                        return rid
-        return None
+        return _first_resource_id(data.get("result", {}).get("results", []))
 
+    @ttl_cache(maxsize=8, ttl=_DISCOVERY_TTL_SECONDS, key=_client_key, none_ttl=_DISCOVERY_MISS_TTL_SECONDS)
     def discover_district_crop_production_resource_id(self) -> Optional[str]:
         """Try to find district-wise crop production dataset resource ID automatically."""
         # Search for district crop production datasets
@@ -137,41 +232,24 @@ class DataGovInClient:
             ("season wise crop production", "organization:department-of-agriculture-and-farmers-welfare"),
             ("district crop production", None),  # Broader search without org filter
         ]
-        
+        paramsets = []
         for query, org_filter in search_terms:
             params = {"q": query, "rows": 30}
             if org_filter:
                 params["fq"] = org_filter
-            
-            data = self._ckan_action("package_search", params)
+            paramsets.append(params)
+
+        # Fire all searches at once, then apply the same priority order in memory
+        for data in self._package_search_many(paramsets):
             if not data or not data.get("success"):
                 continue
             
-            # Look through packages and resources
-            for pkg in data.get("result", {}).get("results", []):
-                pkg_title = (pkg.get("title") or "").lower()
-                pkg_name = (pkg.get("name") or "").lower()
-                # Prioritize packages with "district" and "crop" in the title
-                if "district" in pkg_title or "district" in pkg_name:
-                    for res in pkg.get("resources", []):
-                        res_name = (res.get("name") or "").lower()
-                        fmt = (res.get("format") or "").lower()
-                        if fmt in {"json", "csv"}:
-                            rid = res.get("id") or res.get("resource_id")
-                            if rid:
-                                # Check if it's not the wrong dataset type
-                                if "pollutant" not in pkg_title and "air" not in pkg_title:
-                                    return rid
-            
-            # If no district-specific found, try any crop production resource
-            for pkg in data.get("result", {}).get("results", []):
-                for res in pkg.get("resources", []):
-                    fmt = (res.get("format") or "").lower()
-                    if fmt in {"json", "csv"}:
-                        rid = res.get("id") or res.get("resource_id")
-                        if rid:
-                            return rid
-        
+            packages = data.get("result", {}).get("results", [])
+            # Prioritize packages with "district" in the title/name, else any crop production resource
+            rid = _first_resource_id(packages, _is_district_package) or _first_resource_id(packages)
+            if rid:
+                return rid
+
         return None
 
 
@@ -1,25 +1,51 @@
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
 from config import get_config
 from .ckan_client import DataGovInClient
 
 
+# Used when `discover_datasets` is called without a client
+_DEFAULT_CLIENT: Optional[DataGovInClient] = None
+
+# Independent lookups run side by side; results come back in this order
+_DISCOVERY_METHODS = (
+    "discover_rainfall_resource_id",
+    "discover_crop_production_resource_id",
+    "discover_district_crop_production_resource_id",
+)
+
+
+def _default_client() -> DataGovInClient:
+    global _DEFAULT_CLIENT
+    if _DEFAULT_CLIENT is None:
+        _DEFAULT_CLIENT = DataGovInClient()
+    return _DEFAULT_CLIENT
+
+
+def _discover_all(client: DataGovInClient) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """Run the three discovery lookups concurrently instead of back-to-back."""
+    with ThreadPoolExecutor(max_workers=len(_DISCOVERY_METHODS)) as pool:
+        futures = [pool.submit(getattr(client, name)) for name in _DISCOVERY_METHODS]
+        return tuple(f.result() for f in futures)
+
+
 class DatasetCatalog:
     """Holds discovered datasets grouped by category and subcategory."""
 
     def __init__(self):
         self.datasets: Dict = {}
 
-    def discover_datasets(self, client) -> None:
+    def discover_datasets(self, client: Optional[DataGovInClient] = None) -> None:
         """Populate `self.datasets` using the provided client.
 
         In demo mode, we rely on `DataGovInClient.list_sample_resources()`.
         """
         cfg = get_config()
-        auto_client = DataGovInClient()
-        # Auto-discovery first
-        rainfall_id = auto_client.discover_rainfall_resource_id()
-        crop_id = auto_client.discover_crop_production_resource_id()
-        district_crop_id = auto_client.discover_district_crop_production_resource_id()
+        if client is None:
+            client = _default_client()
+        # Auto-discovery first (lookups are independent, so run them concurrently)
+        rainfall_id, crop_id, district_crop_id = _discover_all(client)
 
         # Fallbacks from config if discovery not found
         rainfall_id = rainfall_id or cfg.rainfall_resource_id
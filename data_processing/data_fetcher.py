@@ -1,13 +1,103 @@
-from typing import Any, Dict, Optional
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
 
 import pandas as pd
-import requests
 from config import get_config
+from utils import fast_json
+from utils.http import shared_session
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional: fall back to pandas' record parsing
+    pa = None
+
+try:
+    import diskcache
+except ImportError:  # optional: fetches are simply not cached
+    diskcache = None
+
+
+# CKAN datastore_search paging: rows per request and requests in flight
+_CKAN_PAGE_SIZE = 1000
+_MAX_CONCURRENT_PAGES = 8
+
+# CKAN datastore field types mapped to Arrow type names; anything else is text
+_CKAN_ARROW_TYPES = {
+    "int": "int64",
+    "int4": "int64",
+    "int8": "int64",
+    "bigint": "int64",
+    "float": "float64",
+    "float8": "float64",
+    "numeric": "float64",
+    "bool": "bool",
+}
+
+
+def _records_to_frame(records: List[Dict], fields: Optional[List[Dict]] = None) -> pd.DataFrame:
+    """Build a DataFrame from JSON records, parsing them in Arrow when available.
+
+    Arrow walks the dicts in C++ and, given CKAN `fields`, types numeric
+    columns up front. Columns are handed back with pandas' default dtypes
+    so downstream NaN handling is unchanged. Records Arrow cannot type
+    consistently (e.g. mixed str/int values) go through pandas instead.
+
+    Both APIs nest the records in a response envelope, so `pyarrow.json`
+    or `pd.read_json` can't read the response bytes directly; re-encoding
+    the records as NDJSON for them costs about what it saves.
+    """
+    columns = [f["id"] for f in fields or [] if f.get("id")] or None
+    if pa is None or not records:
+        return pd.DataFrame.from_records(records, columns=columns)
+    try:
+        struct_type = None
+        if columns:
+            struct_type = pa.struct([
+                (f["id"], pa.type_for_alias(_CKAN_ARROW_TYPES.get(f.get("type"), "string")))
+                for f in fields
+                if f.get("id")
+            ])
+        table = pa.Table.from_struct_array(pa.array(records, type=struct_type))
+    except (pa.ArrowException, TypeError, ValueError):
+        return pd.DataFrame.from_records(records, columns=columns)
+    return table.to_pandas()
+
+
+def _cache_key(resource_id: str, use_ckan: bool, api_key: Optional[str]) -> tuple:
+    """Disk-cache key for a fetch; a digest of the API key, so a changed key never sees another key's results."""
+    key_digest = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+    return (resource_id, use_ckan, key_digest)
 
 
 class DataFetcher:
     """Fetch datasets by resource id from data.gov.in Datastore API or CKAN datastore_search."""
 
+    def __init__(self, cache_dir: Optional[str] = None, cache_ttl: Optional[int] = None):
+        # Process-wide pooled session (never closed here)
+        self._session = shared_session()
+        # Government datasets update at most daily, so parsed frames are cached on disk
+        cfg = get_config()
+        self._cache_ttl = cfg.data_cache_ttl if cache_ttl is None else cache_ttl
+        self._cache = None
+        if diskcache is not None and self._cache_ttl > 0:
+            try:
+                self._cache = diskcache.Cache(cache_dir or cfg.data_cache_dir)
+            except Exception:
+                self._cache = None
+
+    def close(self) -> None:
+        """Release the cache handle held by this fetcher."""
+        if self._cache is not None:
+            self._cache.close()
+
+    def invalidate(self, resource_id: str) -> None:
+        """Drop cached copies of a resource so the next fetch hits the API."""
+        if self._cache is not None:
+            api_key = get_config().data_gov_in_api_key
+            for use_ckan in (False, True):
+                self._cache.delete(_cache_key(resource_id, use_ckan, api_key))
+
     def fetch_dataset(self, resource_id: str, use_ckan: bool = False) -> pd.DataFrame:
         """Fetch dataset using either data.gov.in API or CKAN datastore_search.
         
@@ -24,6 +114,19 @@ class DataFetcher:
                 "DATA_GOV_IN_API_KEY not set or is placeholder. Create .env with DATA_GOV_IN_API_KEY=<your_key>."
             )
 
+        key = _cache_key(resource_id, use_ckan, api_key)
+        if self._cache is not None:
+            cached = self._cache.get(key)
+            if cached is not None:
+                return cached
+
+        df = self._fetch_uncached(resource_id, use_ckan, api_key)
+        # Empty results are usually failed or error responses; retry them next time
+        if self._cache is not None and not df.empty:
+            self._cache.set(key, df, expire=self._cache_ttl)
+        return df
+
+    def _fetch_uncached(self, resource_id: str, use_ckan: bool, api_key: str) -> pd.DataFrame:
         if use_ckan:
             # Use CKAN datastore_search endpoint
             return self._fetch_from_ckan_datastore(resource_id, api_key)
@@ -35,18 +138,18 @@ class DataFetcher:
                 "format": "json",
                 "limit": 5000,
             }
-            resp = requests.get(url, params=params, timeout=60)
+            resp = self._session.get(url, params=params, timeout=60)
             resp.raise_for_status()
-            data = resp.json()
+            data = fast_json.loads(resp.content)
             records = data.get("records", [])
-            return pd.DataFrame.from_records(records)
+            return _records_to_frame(records)
     
     def _fetch_from_ckan_datastore(self, resource_id: str, api_key: str) -> pd.DataFrame:
         """Fetch dataset from CKAN datastore_search endpoint."""
         url = "https://ckandev.indiadataportal.com/api/1/action/datastore_search"
         params: Dict[str, Any] = {
             "resource_id": resource_id,
-            "limit": 5000,
+            "limit": _CKAN_PAGE_SIZE,
         }
         headers = {}
         if api_key:
@@ -55,22 +158,26 @@ class DataFetcher:
             headers["X-API-Key"] = api_key
         
         try:
-            resp = requests.get(url, params=params, headers=headers, timeout=60)
+            resp = self._session.get(url, params=params, headers=headers, timeout=60)
             resp.raise_for_status()
-            data = resp.json()
+            data = fast_json.loads(resp.content)
             
             # CKAN datastore_search returns data in different format
             if data.get("success"):
-                records = data.get("result", {}).get("records", [])
+                result = data.get("result", {})
+                records = result.get("records", [])
                 if records:
-                    return pd.DataFrame.from_records(records)
+                    # First page tells us the total; fetch the rest concurrently
+                    total = int(result.get("total") or len(records))
+                    records += self._fetch_ckan_pages(url, params, headers, total)
+                    return _records_to_frame(records, result.get("fields"))
             
             # Try alternative response format
             if "records" in data:
-                return pd.DataFrame.from_records(data["records"])
+                return _records_to_frame(data["records"])
             
             return pd.DataFrame()
-        except Exception as e:
+        except Exception:
             # Fallback to data.gov.in API if CKAN fails
             url = f"https://api.data.gov.in/resource/{resource_id}"
             params = {
@@ -78,10 +185,30 @@ class DataFetcher:
                 "format": "json",
                 "limit": 5000,
             }
-            resp = requests.get(url, params=params, timeout=60)
+            resp = self._session.get(url, params=params, timeout=60)
             resp.raise_for_status()
-            data = resp.json()
+            data = fast_json.loads(resp.content)
             records = data.get("records", [])
-            return pd.DataFrame.from_records(records)
+            return _records_to_frame(records)
+
+    def _fetch_ckan_pages(
+        self, url: str, params: Dict[str, Any], headers: Dict[str, str], total: int
+    ) -> List[Dict]:
+        """Fetch every `datastore_search` page after the first, in offset order."""
+        offsets = range(_CKAN_PAGE_SIZE, total, _CKAN_PAGE_SIZE)
+        if not offsets:
+            return []
 
+        def get_page(offset: int) -> List[Dict]:
+            resp = self._session.get(
+                url, params={**params, "offset": offset}, headers=headers, timeout=60
+            )
+            resp.raise_for_status()
+            return fast_json.loads(resp.content).get("result", {}).get("records", [])
 
+        # The shared session's pool (32) is larger than the worker count, so threads don't block on it
+        records: List[Dict] = []
+        with ThreadPoolExecutor(max_workers=min(_MAX_CONCURRENT_PAGES, len(offsets))) as pool:
+            for page in pool.map(get_page, offsets):
+                records.extend(page)
+        return records
@@ -1,37 +1,168 @@
 # data_processing/data_store.py
 
-from typing import Dict, Optional
+import json
+import os
+import time
+from typing import Dict, List, Optional
 
 import pandas as pd
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # optional: datasets are kept as plain DataFrames
+    pa = None
+    pc = None
+    pq = None
+
+# Written last when saving a snapshot; its mtime dates the whole snapshot
+_SNAPSHOT_INDEX = "index.json"
+
+
+def _dictionary_encoded(table):
+    """`table` with its mostly-repeated string columns (e.g. state, district, crop) dictionary-encoded.
+
+    Parquet keeps the dictionaries, so a loaded snapshot hands out these
+    columns as categoricals without hashing the strings again. Each
+    dictionary is sorted, matching the category order of `astype("category")`.
+    """
+    for i, field in enumerate(table.schema):
+        if not (pa.types.is_string(field.type) or pa.types.is_large_string(field.type)):
+            continue
+        column = table.column(i)
+        if pc.count_distinct(column).as_py() > len(table) // 2:
+            continue
+        values = pc.unique(column).drop_null()
+        values = pc.take(values, pc.sort_indices(values))
+        indices = pc.index_in(column, value_set=values).combine_chunks()
+        table = table.set_column(i, field.name, pa.DictionaryArray.from_arrays(indices, values))
+    return table
+
+
 class DataStore:
-    """In-memory store for processed datasets"""
-    
+    """In-memory store for processed datasets
+
+    When pyarrow is available each dataset is held as a columnar
+    `pyarrow.Table` (compact, contiguous string buffers instead of one
+    Python object per cell) and materialized as a DataFrame on retrieval,
+    optionally projected to just the requested columns.
+    """
+
     def __init__(self):
         self.agriculture_data = {}
         self.climate_data = {}
         self.metadata = {}
-        
+
     def add_dataset(self, category: str, name: str, df: pd.DataFrame, metadata: Dict):
         """Add cleaned dataset to store"""
+        data = self._to_table(df)
         if category == 'agriculture':
-            self.agriculture_data[name] = df
+            self.agriculture_data[name] = data
         elif category == 'climate':
-            self.climate_data[name] = df
-        
+            self.climate_data[name] = data
+
         self.metadata[name] = metadata
-    
-    def get_dataset(self, name: str) -> Optional[pd.DataFrame]:
-        """Retrieve dataset by name"""
+
+    def get_dataset(self, name: str, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """Retrieve dataset by name, optionally only the given columns.
+
+        Raises KeyError when a requested column doesn't exist, whichever
+        way the dataset is stored. An Arrow-backed dataset is converted to
+        a new DataFrame on every call; callers that read it repeatedly
+        should use `get_table` and keep their own conversion.
+        """
+        data = self.get_table(name)
+        if data is None:
+            return None
+        if isinstance(data, pd.DataFrame):
+            return data[columns] if columns else data
+        if columns:
+            missing = [c for c in columns if c not in data.column_names]
+            if missing:
+                raise KeyError(f"{missing} not in dataset {name!r}")
+            data = data.select(columns)
+        return data.to_pandas()
+
+    def get_table(self, name: str):
+        """Retrieve the stored representation (Arrow table or DataFrame) by name"""
         if name in self.agriculture_data:
             return self.agriculture_data[name]
         if name in self.climate_data:
             return self.climate_data[name]
         return None
-    
+
     def list_datasets(self) -> Dict:
         """List all available datasets"""
         return {
             'agriculture': list(self.agriculture_data.keys()),
             'climate': list(self.climate_data.keys())
-        }
\ No newline at end of file
+        }
+
+    def save_snapshot(self, directory: str, config: Optional[Dict] = None) -> bool:
+        """Persist all datasets as parquet files under `directory`.
+
+        `config` (JSON-serializable settings the data was loaded under) is
+        recorded in the index; `load_snapshot` only reuses a snapshot whose
+        recorded config matches. Returns False (leaving any previous snapshot
+        in place) when pyarrow is missing, the store is empty or a dataset
+        cannot be written.
+        """
+        if pq is None or not (self.agriculture_data or self.climate_data):
+            return False
+        directory = os.path.expanduser(directory)
+        index = {"agriculture": {}, "climate": {}, "metadata": self.metadata, "config": config or {}}
+        try:
+            os.makedirs(directory, exist_ok=True)
+            for category, datasets in (("agriculture", self.agriculture_data), ("climate", self.climate_data)):
+                for name, data in datasets.items():
+                    table = _dictionary_encoded(data if isinstance(data, pa.Table) else pa.Table.from_pandas(data))
+                    filename = f"{category}__{name}.parquet"
+                    pq.write_table(table, os.path.join(directory, filename))
+                    index[category][name] = filename
+            tmp = os.path.join(directory, _SNAPSHOT_INDEX + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(index, fh, default=str)
+            os.replace(tmp, os.path.join(directory, _SNAPSHOT_INDEX))
+        except (OSError, TypeError, ValueError, pa.ArrowException):
+            return False
+        return True
+
+    @classmethod
+    def load_snapshot(cls, directory: str, max_age: float, config: Optional[Dict] = None) -> Optional["DataStore"]:
+        """Rebuild a store from `save_snapshot` output if it is under `max_age` seconds old.
+
+        Returns None when the snapshot was saved under a different `config`
+        or holds no datasets.
+        """
+        if pq is None or max_age <= 0:
+            return None
+        directory = os.path.expanduser(directory)
+        index_path = os.path.join(directory, _SNAPSHOT_INDEX)
+        try:
+            if time.time() - os.path.getmtime(index_path) > max_age:
+                return None
+            with open(index_path, encoding="utf-8") as fh:
+                index = json.load(fh)
+            if index.get("config", {}) != (config or {}):
+                return None
+            if not (index.get("agriculture") or index.get("climate")):
+                return None
+            store = cls()
+            for category, datasets in (("agriculture", store.agriculture_data), ("climate", store.climate_data)):
+                for name, filename in index.get(category, {}).items():
+                    datasets[name] = pq.read_table(os.path.join(directory, filename))
+            store.metadata = index.get("metadata", {})
+        except (OSError, ValueError, pa.ArrowException):
+            return None
+        return store
+
+    @staticmethod
+    def _to_table(df: pd.DataFrame):
+        if pa is None:
+            return df
+        try:
+            return pa.Table.from_pandas(df)
+        except (pa.ArrowException, TypeError, ValueError):
+            # Mixed-type object columns cannot be typed by Arrow; keep the frame
+            return df
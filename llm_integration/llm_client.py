@@ -1,4 +1,144 @@
+import json
+import logging
+from typing import Any, Hashable, Iterator, Optional
+
 from config import get_config
+from utils import fast_json
+from utils.cache import TTLCache
+
+
+logger = logging.getLogger(__name__)
+
+_STRUCTURED_MARKER = "Structured results"
+_JSON_DECODER = json.JSONDecoder()
+
+# Answers kept per client for repeated identical questions
+_RESPONSE_CACHE_SIZE = 256
+
+# Shown after a streamed answer that the provider cut off, ahead of the basic answer
+_INTERRUPTED_NOTICE = "\n\n⚠️ **Note**: The answer above was cut off because the language model stopped responding. Summary from the structured results:\n\n"
+
+
+def _freeze(obj: Any) -> Hashable:
+    """Recursively convert dicts/lists into hashable frozensets/tuples.
+
+    Raises TypeError for any other unhashable value (e.g. a DataFrame or
+    array): their reprs are truncated, so they can't key a cache faithfully.
+    """
+    if isinstance(obj, dict):
+        return frozenset((k, _freeze(v)) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return tuple(_freeze(v) for v in obj)
+    if isinstance(obj, set):
+        return frozenset(_freeze(v) for v in obj)
+    hash(obj)
+    return obj
+
+
+def _response_key(prompt: str, results: Optional[dict]) -> Optional[Hashable]:
+    """Cache key for an answer, or None when it shouldn't be cached (errors, unhashable results)."""
+    if _has_error(results):
+        return None
+    try:
+        return (prompt, _freeze(results))
+    except TypeError:
+        return None
+
+
+def _has_error(results: Optional[dict]) -> bool:
+    """True when the results, or any per-intent payload in them, carry an error."""
+    if not results:
+        return False
+    if "error" in results:
+        return True
+    answer_data = results.get("answer_data") or {}
+    return any(isinstance(v, dict) and "error" in v for v in answer_data.values())
+
+
+def _extract_structured_results(prompt: str) -> Optional[dict]:
+    """Return the JSON object that follows "Structured results ...:" in a prompt.
+
+    The common case is the object running to the last closing brace, which
+    is parsed in one shot; otherwise `raw_decode` locates the matching close.
+    Both are a single linear pass, unlike a greedy DOTALL regex.
+    """
+    start = prompt.find(_STRUCTURED_MARKER)
+    if start < 0:
+        return None
+    colon = prompt.find(":", start)
+    while colon >= 0:
+        brace = colon + 1
+        while brace < len(prompt) and prompt[brace].isspace():
+            brace += 1
+        if brace < len(prompt) and prompt[brace] == "{":
+            try:
+                obj = fast_json.loads(prompt[brace:prompt.rfind("}") + 1])
+            except ValueError:
+                try:
+                    obj, _ = _JSON_DECODER.raw_decode(prompt, brace)
+                except ValueError:
+                    return None
+            return obj if isinstance(obj, dict) else None
+        colon = prompt.find(":", colon + 1)
+    return None
+
+
+def _state_crop_year(payload: dict) -> tuple:
+    """Display-ready (state, crop, year) from a result payload."""
+    return (
+        payload.get('state', '').title(),
+        payload.get('crop', '').title(),
+        payload.get('year', ''),
+    )
+
+
+def _format_district_highest_crop_year(dhc: dict) -> Optional[str]:
+    if 'error' in dhc:
+        error_msg = dhc.get('error', 'Unknown error')
+        if 'total_production' in dhc and dhc.get('warning'):
+            # State-level fallback response
+            state, crop, year = _state_crop_year(dhc)
+            total_prod = dhc.get('total_production', 0)
+            return f"⚠️ **Note**: District-level data is not available. However, {state} had a total {crop} production of {total_prod:,.0f} tonnes in {year}. For district-specific information, please ensure a valid DISTRICT_CROP_PRODUCTION_RESOURCE_ID is configured."
+        if 'schema unexpected' in error_msg.lower():
+            return "⚠️ **Error**: The district crop production dataset has an incorrect schema. The resource ID `DISTRICT_CROP_PRODUCTION_RESOURCE_ID` appears to be pointing to a different dataset type (possibly air pollution data). Please update your `.env` file with the correct resource ID for district crop production data from data.gov.in."
+        return f"⚠️ **Error**: {error_msg}"
+    if 'district' in dhc and 'production' in dhc:
+        state, crop, year = _state_crop_year(dhc)
+        district = dhc.get('district', '')
+        production = dhc.get('production', 0)
+        return f"**Answer**: {district} district in {state} had the highest {crop} production in {year}, with {production:,.0f} tonnes."
+    return None
+
+
+def _format_district_crop_comparison(dcc: dict) -> Optional[str]:
+    if 'error' in dcc:
+        return f"⚠️ **Error**: {dcc.get('error', 'Unknown error')}"
+    # Could format district comparison results here
+    return None
+
+
+def _format_rainfall_compare(rc) -> Optional[str]:
+    if not isinstance(rc, dict):
+        return "✓ Rainfall comparison data is available. See the visualization above for details."
+    return None
+
+
+def _format_top_crops_state(tcs: dict) -> Optional[str]:
+    if 'error' not in tcs and 'crops' in tcs:
+        state = tcs.get('state', '').title()
+        top_n = tcs.get('top_n', 0)
+        return f"✓ Top {top_n} crops for {state} are shown in the table above."
+    return None
+
+
+# answer_data key -> formatter, checked in this order; a formatter returns None to defer
+_FORMATTERS = {
+    'district_highest_crop_year': _format_district_highest_crop_year,
+    'district_crop_comparison': _format_district_crop_comparison,
+    'rainfall_compare': _format_rainfall_compare,
+    'top_crops_state': _format_top_crops_state,
+}
 
 
 class LLMClient:
@@ -31,34 +171,71 @@ class LLMClient:
                 self.provider = None
                 self.client = None
 
+        self._response_cache = TTLCache(maxsize=_RESPONSE_CACHE_SIZE)
+
     def generate_response(self, prompt: str, results: dict = None) -> str:
-        # Try configured provider; on any exception (e.g., 401 invalid x-api-key), fall back to demo response
-        if self.provider == "anthropic" and self.client:
-            try:
-                msg = self.client.messages.create(
-                    model="claude-3-5-sonnet-latest",
-                    max_tokens=400,
-                    messages=[{"role": "user", "content": prompt}],
-                )
-                return msg.content[0].text if getattr(msg, "content", None) else str(msg)
-            except Exception:
-                pass
+        return "".join(self.generate_response_stream(prompt, results))
 
-        if self.provider == "openai" and self.client:
-            try:
-                chat = self.client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.2,
-                    max_tokens=400,
-                )
-                return chat.choices[0].message.content
-            except Exception:
-                pass
+    def generate_response_stream(self, prompt: str, results: dict = None) -> Iterator[str]:
+        """Yield the answer in pieces as the provider produces them."""
+        # Identical question + results -> reuse the earlier answer (skips the paid API call)
+        key = _response_key(prompt, results)
+        if key is not None:
+            cached = self._response_cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        chunks = []
+        try:
+            for text in self._stream_with_provider(prompt):
+                chunks.append(text)
+                yield text
+        except Exception:
+            # e.g. 401 invalid x-api-key, or the stream dropped midway; don't cache a partial answer
+            logger.exception("LLM provider %s failed after %d streamed chunks", self.provider, len(chunks))
+            key = None
+            if chunks:
+                # Don't let a truncated answer pass for a complete one
+                yield _INTERRUPTED_NOTICE + self._generate_basic_answer(prompt, results)
+                return
+
+        if not chunks:
+            # Generate a basic answer from structured data if available
+            # This provides a response even without LLM API key
+            answer = self._generate_basic_answer(prompt, results)
+            if self.client is not None:
+                # The provider failed; don't pin the fallback answer in the cache
+                key = None
+            chunks.append(answer)
+            yield answer
 
-        # Generate a basic answer from structured data if available
-        # This provides a response even without LLM API key
-        return self._generate_basic_answer(prompt, results)
+        if key is not None:
+            self._response_cache.set(key, "".join(chunks))
+
+    def _stream_with_provider(self, prompt: str) -> Iterator[str]:
+        """Text deltas from the configured provider; yields nothing when none is configured."""
+        if self.provider == "anthropic" and self.client:
+            with self.client.messages.stream(
+                model="claude-3-5-sonnet-latest",
+                max_tokens=400,
+                messages=[{"role": "user", "content": prompt}],
+            ) as stream:
+                for text in stream.text_stream:
+                    if text:
+                        yield text
+
+        elif self.provider == "openai" and self.client:
+            stream = self.client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.2,
+                max_tokens=400,
+                stream=True,
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
     
     def _generate_basic_answer(self, prompt: str, results: dict = None) -> str:
         """Generate a basic answer without LLM by parsing structured data."""
@@ -67,19 +244,10 @@ class LLMClient:
             return self._format_answer_from_results(results)
         
         # Fallback: try to extract from prompt text
-        import json
-        import re
         try:
-            if "Structured results" in prompt:
-                json_match = re.search(r'Structured results.*?:\s*(\{.*\})', prompt, re.DOTALL)
-                if json_match:
-                    results_str = json_match.group(1)
-                    results_str = results_str.strip()
-                    try:
-                        results = json.loads(results_str)
-                        return self._format_answer_from_results(results)
-                    except json.JSONDecodeError:
-                        pass
+            results = _extract_structured_results(prompt)
+            if results is not None:
+                return self._format_answer_from_results(results)
         except Exception:
             pass
         
@@ -94,54 +262,14 @@ class LLMClient:
     
     def _format_answer_from_results(self, results: dict) -> str:
         """Format a readable answer from structured results."""
-        answer_parts = []
-        
-        # Check for errors first
         answer_data = results.get('answer_data', {}) or {}
-        
-        # Check for district crop queries
-        if 'district_highest_crop_year' in answer_data:
-            dhc = answer_data['district_highest_crop_year']
-            if 'error' in dhc:
-                error_msg = dhc.get('error', 'Unknown error')
-                if 'total_production' in dhc and dhc.get('warning'):
-                    # State-level fallback response
-                    state = dhc.get('state', '').title()
-                    crop = dhc.get('crop', '').title()
-                    year = dhc.get('year', '')
-                    total_prod = dhc.get('total_production', 0)
-                    return f"⚠️ **Note**: District-level data is not available. However, {state} had a total {crop} production of {total_prod:,.0f} tonnes in {year}. For district-specific information, please ensure a valid DISTRICT_CROP_PRODUCTION_RESOURCE_ID is configured."
-                if 'schema unexpected' in error_msg.lower():
-                    return "⚠️ **Error**: The district crop production dataset has an incorrect schema. The resource ID `DISTRICT_CROP_PRODUCTION_RESOURCE_ID` appears to be pointing to a different dataset type (possibly air pollution data). Please update your `.env` file with the correct resource ID for district crop production data from data.gov.in."
-                return f"⚠️ **Error**: {error_msg}"
-            elif 'district' in dhc and 'production' in dhc:
-                state = dhc.get('state', '').title()
-                district = dhc.get('district', '')
-                crop = dhc.get('crop', '').title()
-                year = dhc.get('year', '')
-                production = dhc.get('production', 0)
-                return f"**Answer**: {district} district in {state} had the highest {crop} production in {year}, with {production:,.0f} tonnes."
-        
-        # Check for other query types
-        if 'district_crop_comparison' in answer_data:
-            dcc = answer_data['district_crop_comparison']
-            if 'error' in dcc:
-                return f"⚠️ **Error**: {dcc.get('error', 'Unknown error')}"
-            # Could format district comparison results here
-        
-        if 'rainfall_compare' in answer_data:
-            rc = answer_data['rainfall_compare']
-            if not isinstance(rc, dict):
-                return "✓ Rainfall comparison data is available. See the visualization above for details."
-        
-        if 'top_crops_state' in answer_data:
-            tcs = answer_data['top_crops_state']
-            if 'error' not in tcs and 'crops' in tcs:
-                state = tcs.get('state', '').title()
-                top_n = tcs.get('top_n', 0)
-                return f"✓ Top {top_n} crops for {state} are shown in the table above."
-        
-        # Generic success message
-        return "✓ Query executed successfully. See the detailed results and visualizations above."
 
+        # First formatter (in priority order) that has something to say wins
+        for key, formatter in _FORMATTERS.items():
+            if key in answer_data:
+                answer = formatter(answer_data[key])
+                if answer is not None:
+                    return answer
 
+        # Generic success message
+        return "✓ Query executed successfully. See the detailed results and visualizations above."
@@ -1,16 +1,23 @@
+from functools import lru_cache
 from typing import Any, Dict
 
+from utils import fast_json
+
+
+@lru_cache(maxsize=512)
+def _build_answer_synthesis_prompt(question: str, results_blob: bytes) -> str:
+    return (
+        "You are an analyst answering questions about Indian agriculture and climate data.\n"
+        "Use the provided structured results to produce a short, clear answer.\n\n"
+        f"Question:\n{question}\n\n"
+        f"Structured results (JSON-like):\n{results_blob.decode()}\n\n"
+        "Answer:"
+    )
+
 
 class PromptTemplates:
     """Collection of simple prompt builders used by the demo app."""
 
     def answer_synthesis_prompt(self, question: str, results: Dict[str, Any]) -> str:
-        return (
-            "You are an analyst answering questions about Indian agriculture and climate data.\n"
-            "Use the provided structured results to produce a short, clear answer.\n\n"
-            f"Question:\n{question}\n\n"
-            f"Structured results (JSON-like):\n{results}\n\n"
-            "Answer:"
-        )
-
-
+        # Canonical JSON makes the prompt (and anything keyed on it) stable for equal results
+        return _build_answer_synthesis_prompt(question, fast_json.dumps_canonical(results))
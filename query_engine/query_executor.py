@@ -1,84 +1,610 @@
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache, wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import os
 import re
+import threading
+import weakref
 
+import numpy as np
 import pandas as pd
 from config import get_config
 from data_processing.data_fetcher import DataFetcher
 
+try:
+    from data_discovery.ckan_client import DataGovInClient
+except ImportError:  # optional: no auto-discovery fallback for the district dataset
+    DataGovInClient = None
+
+try:
+    import polars as pl
+except ImportError:  # optional: aggregations stay in pandas
+    pl = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # optional: the data store then holds DataFrames, not Arrow tables
+    pa = pc = None
+
+try:
+    from numba import njit
+except ImportError:  # optional: district totals use numpy
+    njit = None
+
+
+# Column names seen across data.gov.in crop datasets, per role, in preference order
+_COLUMN_CANDIDATES: Dict[str, Tuple[str, ...]] = {
+    "state": ("State_Name", "STATE", "State", "STATE/UT", "STATE_UT_NAME", "State Name"),
+    "district": ("District_Name", "District", "DISTRICT", "District Name"),
+    "crop": ("Crop", "CROP", "Crop_Name", "Commodity", "CROP_NAME"),
+    "production": ("Production", "PRODUCTION", "Prodn", "PROD", "production_tonnes", "Prod"),
+    "year": ("Year", "YEAR", "year"),
+}
+
+# First four-digit run in a year label ("2014-15" -> "2014")
+_YEAR_RE = re.compile(r"(\d{4})")
+
+# Runs the steps of multi-step plans for every executor (one per Streamlit session);
+# threads start on first use, are then reused, and are joined at interpreter exit
+_STEP_POOL = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="plan-step")
+
+# Column names seen across rainfall datasets, per role, in preference order
+_RAINFALL_COLUMN_CANDIDATES: Dict[str, Tuple[str, ...]] = {
+    "state": ("STATE", "STATE_UT_NAME", "SUBDIVISION", "State", "STATE/UT", "subdivision"),
+    "year": ("YEAR", "Year", "year"),
+    "annual": ("ANNUAL", "Annual", "ANN", "Rainfall", "annual"),
+}
+
+
+@dataclass(frozen=True)
+class SchemaMap:
+    """Actual column name for each role in a crop dataset (None when absent)."""
+
+    state: Optional[str]
+    district: Optional[str]
+    crop: Optional[str]
+    production: Optional[str]
+    year: Optional[str]
+
+
+def _match_column(columns, candidates, lower_map: Optional[Dict[str, str]] = None) -> Optional[str]:
+    """First candidate present in `columns`, exact match first, then case-insensitive."""
+    for c in candidates:
+        if c in columns:
+            return c
+    if lower_map is None:
+        lower_map = {c.lower(): c for c in columns}
+    for c in candidates:
+        if c.lower() in lower_map:
+            return lower_map[c.lower()]
+    return None
+
+
+def _match_columns(columns, candidates_by_role: Dict[str, Tuple[str, ...]]) -> Dict[str, Optional[str]]:
+    """`_match_column` per role, lower-casing the column names only once."""
+    present = frozenset(columns)
+    lower_map = {c.lower(): c for c in columns}
+    return {role: _match_column(present, cands, lower_map) for role, cands in candidates_by_role.items()}
+
+
+@lru_cache(maxsize=64)
+def _resolve_columns(columns: Tuple[str, ...]) -> SchemaMap:
+    return SchemaMap(**_match_columns(columns, _COLUMN_CANDIDATES))
+
+
+def _resolve_schema(df: pd.DataFrame) -> SchemaMap:
+    """Resolve column roles for `df`; cached on its column names, which is all the lookup depends on."""
+    return _resolve_columns(tuple(str(c) for c in df.columns))
+
+
+@lru_cache(maxsize=16)
+def _resolve_rainfall_columns(columns: Tuple[str, ...]) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """(state, year, annual) columns of a rainfall frame, cached on its column names like `_resolve_columns`."""
+    found = _match_columns(columns, _RAINFALL_COLUMN_CANDIDATES)
+    return found["state"], found["year"], found["annual"]
+
+
+# Lower-cased labels per categories Index (keyed by id, evicted when the Index is collected)
+_LOWER_CATEGORIES: Dict[int, np.ndarray] = {}
+
+# Per categories Index (same keys and eviction as above): lower-cased needle -> label hits
+_CATEGORY_HITS: Dict[int, Dict[str, np.ndarray]] = {}
+
+# Guards both caches, which `_STEP_POOL` threads share. Re-entrant because the eviction
+# finalizer runs in whichever thread triggers collection, possibly one already holding it.
+_CATEGORY_LOCK = threading.RLock()
+
+
+def _forget_categories(key: int) -> None:
+    with _CATEGORY_LOCK:
+        _LOWER_CATEGORIES.pop(key, None)
+        _CATEGORY_HITS.pop(key, None)
+
+
+def _lower_categories(categories: pd.Index) -> np.ndarray:
+    key = id(categories)
+    with _CATEGORY_LOCK:
+        lowered = _LOWER_CATEGORIES.get(key)
+    if lowered is None:
+        # One label per category; missing values (code -1) have none and never match
+        lowered = np.asarray(categories.astype(str).str.lower(), dtype=str)
+        with _CATEGORY_LOCK:
+            if key in _LOWER_CATEGORIES:
+                # Another thread got here first; keep its (identical) labels
+                return _LOWER_CATEGORIES[key]
+            _LOWER_CATEGORIES[key] = lowered
+            weakref.finalize(categories, _forget_categories, key)
+    return lowered
+
+
+def _category_hits(categories: pd.Index, needle: str) -> np.ndarray:
+    """Which `_lower_categories(categories)` labels contain `needle`, remembered per needle."""
+    lowered = _lower_categories(categories)
+    needle = needle.lower()
+    key = id(categories)
+    with _CATEGORY_LOCK:
+        hits = _CATEGORY_HITS.get(key, {}).get(needle)
+    if hits is None:
+        hits = np.char.find(lowered, needle) >= 0
+        with _CATEGORY_LOCK:
+            hits_by_needle = _CATEGORY_HITS.setdefault(key, {})
+            if len(hits_by_needle) >= 256:
+                hits_by_needle.clear()
+            hits_by_needle[needle] = hits
+    return hits
+
+
+def _code_hits(hits: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """`hits` per label broadcast to rows by their codes; missing values (code -1) are False, as with `na=False`."""
+    mask = np.zeros(len(codes), dtype=bool)
+    present = codes >= 0
+    mask[present] = hits[codes[present]]
+    return mask
+
+
+def _contains(series: pd.Series, needle: str) -> pd.Series:
+    """Case-insensitive substring mask, like `astype(str).str.contains(needle, case=False)`.
+
+    The needle is matched literally. For categorical columns it is compared
+    once per category and the hits are broadcast through the integer codes.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        hits = _category_hits(series.cat.categories, needle)
+        return pd.Series(_code_hits(hits, series.cat.codes.to_numpy()), index=series.index)
+    if not isinstance(series.dtype, pd.StringDtype):
+        series = series.astype(str)
+    return series.str.contains(needle, case=False, na=False, regex=False)
+
+
+def _stripped_names(series: pd.Series) -> pd.Series:
+    """`series.astype(str).str.strip()`, applied per category (not per row) for categorical columns."""
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.astype(str).str.strip()
+    # Labels that only differ by padding become one category, as they become one string
+    label_codes, labels = pd.factorize(series.cat.categories.astype(str).str.strip(), sort=True)
+    codes = series.cat.codes.to_numpy()
+    codes = np.where(codes >= 0, label_codes[codes], -1)
+    return pd.Series(pd.Categorical.from_codes(codes, labels), index=series.index, name=series.name)
+
+
+def _with_categorical_names(df: pd.DataFrame) -> pd.DataFrame:
+    """Shallow copy of `df` with its state/district/crop columns as categoricals.
+
+    Name filters then lower-case and match each distinct label once (see
+    `_contains`) instead of every row, on every question. Other text
+    columns that mostly repeat (e.g. Season) are dictionary-encoded the
+    same way, so each distinct string is stored once; production and year
+    stay as they are for numeric parsing.
+    """
+    schema = _resolve_schema(df)
+    df = df.copy(deep=False)
+    names = {schema.state, schema.district, schema.crop} - {None}
+    for col in df.columns:
+        dtype = df[col].dtype
+        if isinstance(dtype, pd.CategoricalDtype) or col in (schema.production, schema.year):
+            continue
+        if col in names or (
+            (dtype == object or isinstance(dtype, pd.StringDtype))
+            and df[col].nunique() <= len(df) // 2
+        ):
+            df[col] = df[col].astype("category")
+    return df
+
+
+def _same_column_data(a: pd.DataFrame, b: pd.DataFrame, col: str) -> bool:
+    """Whether `a[col]` and `b[col]` share their data, as after `copy(deep=False)` and no reassignment."""
+    if col not in a.columns or col not in b.columns:
+        return False
+    x, y = a[col].array, b[col].array
+    if isinstance(x, pd.Categorical) and isinstance(y, pd.Categorical):
+        return x.categories.equals(y.categories) and np.shares_memory(x.codes, y.codes)
+    try:
+        # Zero-copy for NumPy-backed columns; anything else converts to a fresh array and fails the check
+        return np.shares_memory(x.to_numpy(), y.to_numpy())
+    except (TypeError, ValueError):
+        return False
+
+
+def _arrow_frame(table) -> pd.DataFrame:
+    """`table.to_pandas()`, prepared like `_with_categorical_names`, encoding in Arrow.
+
+    Name and mostly-repeated text columns are dictionary-encoded by Arrow's
+    hash kernels before conversion, so they arrive as categoricals without
+    a Python string per row. Categories are then sorted, as
+    `astype("category")` leaves them.
+    """
+    schema = _resolve_columns(tuple(table.column_names))
+    names = {schema.state, schema.district, schema.crop} - {None}
+    for i, field in enumerate(table.schema):
+        if field.name in (schema.production, schema.year):
+            continue
+        if not (pa.types.is_string(field.type) or pa.types.is_large_string(field.type)):
+            continue
+        column = table.column(i)
+        if field.name in names or pc.count_distinct(column).as_py() <= len(table) // 2:
+            table = table.set_column(i, field.name, pc.dictionary_encode(column))
+    df = table.to_pandas()
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            categories = df[col].cat.categories
+            if not categories.is_monotonic_increasing:
+                df[col] = df[col].cat.reorder_categories(categories.sort_values())
+    return _with_categorical_names(df)
+
+
+def _year_numbers(values: pd.Series) -> pd.Series:
+    """Year per value (nullable Int64): numbers truncated, text like "2014-15" by its first four digits."""
+    numeric = pd.to_numeric(values, errors="coerce").astype(float)
+    numeric = np.trunc(numeric.where(np.isfinite(numeric)))
+    if not pd.api.types.is_numeric_dtype(values):
+        digits = values.astype(str).str.extract(_YEAR_RE, expand=False)
+        numeric = numeric.fillna(pd.to_numeric(digits, errors="coerce"))
+    return numeric.astype("Int64")
+
+
+def _group_codes(keys: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """Integer group codes (-1 for missing) and their labels, in groupby's sorted order."""
+    if isinstance(keys.dtype, pd.CategoricalDtype):
+        return keys.cat.codes.to_numpy(), keys.cat.categories
+    return pd.factorize(keys, sort=True)
+
+
+def _descending_order(values: np.ndarray) -> np.ndarray:
+    """Positions in the order pandas' sort_values(ascending=False) gives, ties included."""
+    return np.arange(len(values))[::-1][values[::-1].argsort(kind="quicksort")][::-1]
+
+
+def _top_positions(values: np.ndarray, top_n: int) -> np.ndarray:
+    """First `top_n` positions of `_descending_order(values)`, ranking only the candidates when `top_n` is small."""
+    if top_n >= len(values):
+        return _descending_order(values)
+    if top_n <= 0:
+        return np.empty(0, dtype=np.intp)
+    # Values tied with the top_n-th largest stay candidates, so ties rank as in the full order
+    cutoff = np.partition(values, len(values) - top_n)[len(values) - top_n]
+    candidates = np.flatnonzero(values >= cutoff)
+    return candidates[_descending_order(values[candidates])][:top_n]
+
+
+def _top_group_sums(keys: pd.Series, values: pd.Series, top_n: int, key_name: str, value_name: str) -> List[Dict[str, Any]]:
+    """Records of the `top_n` largest per-key sums, like groupby-sum + sort_values + head.
+
+    Sums come from one `np.add.reduceat` over rows sorted by key code,
+    which keeps integer totals integral. Missing keys are dropped and
+    missing values count as 0, as in `groupby().sum()`.
+    """
+    codes, labels = _group_codes(keys)
+    present = codes >= 0
+    codes = codes[present]
+    vals = values.to_numpy()[present]
+    if vals.dtype.kind == "f":
+        vals = np.nan_to_num(vals, nan=0.0)
+    if not len(codes):
+        return []
+    order = np.argsort(codes, kind="stable")
+    codes, vals = codes[order], vals[order]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    sums = np.add.reduceat(vals, starts)
+    ranked = _top_positions(sums, top_n)
+    return [
+        {key_name: labels[codes[starts[i]]], value_name: sums[i].item()}
+        for i in ranked
+    ]
+
+
+def _accumulate_year(rows, codes, years, values, target_year, sums, counts) -> None:
+    """Add each of `rows` in `target_year` into `sums[code]`/`counts[code]` (NaN values add 0)."""
+    rows = rows[(years[rows] == target_year) & (codes[rows] >= 0)]
+    picked = values[rows]
+    if picked.dtype.kind == "f":
+        picked = np.nan_to_num(picked, nan=0.0)
+    np.add.at(sums, codes[rows], picked)
+    np.add.at(counts, codes[rows], 1)
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _accumulate_year(rows, codes, years, values, target_year, sums, counts):  # noqa: F811
+        for i in rows:
+            code = codes[i]
+            if code >= 0 and years[i] == target_year:
+                counts[code] += 1
+                v = values[i]
+                if v == v:
+                    sums[code] += v
+
+
+def _accumulate_grid(codes, year_codes, values, n_years, sums, counts) -> None:
+    """Add each value into `sums`/`counts[code * n_years + year_code]`, skipping -1 codes (NaN values add 0)."""
+    keep = (codes >= 0) & (year_codes >= 0)
+    cells = codes[keep].astype(np.int64) * n_years + year_codes[keep]
+    picked = values[keep]
+    if picked.dtype.kind == "f":
+        picked = np.nan_to_num(picked, nan=0.0)
+    np.add.at(sums, cells, picked)
+    np.add.at(counts, cells, 1)
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _accumulate_grid(codes, year_codes, values, n_years, sums, counts):  # noqa: F811
+        for i in range(codes.shape[0]):
+            code = codes[i]
+            year_code = year_codes[i]
+            if code >= 0 and year_code >= 0:
+                cell = code * n_years + year_code
+                counts[cell] += 1
+                v = values[i]
+                if v == v:
+                    sums[cell] += v
+
+
+def _year_array(values: pd.Series) -> np.ndarray:
+    """Years as numpy: the parsed integer dtype when complete, else float with NaN for missing."""
+    years = pd.to_numeric(values, errors="coerce")
+    if isinstance(years.dtype, np.dtype) and years.dtype.kind in "iu":
+        return years.to_numpy()
+    return years.to_numpy(dtype=float, na_value=np.nan)
+
+
+def _narrow_float(values: np.ndarray) -> np.ndarray:
+    """A float32 copy of float64 `values` when it holds them exactly (e.g. whole tonnes), else `values`."""
+    if values.dtype != np.float64:
+        return values
+    narrow = values.astype(np.float32)
+    return narrow if np.array_equal(narrow, values, equal_nan=True) else values
+
+
+@dataclass(frozen=True)
+class DistrictArrays:
+    """Column arrays of a district frame, extracted once so queries scan plain numpy.
+
+    Names are group codes (-1 when missing) into their label Index, years
+    are integers (float with NaN when some are missing) and production
+    keeps the frame's dtype, narrowed to float32 when that is exact (sums
+    still accumulate in float64).
+    Rows are stored grouped by (state, crop) pair, in frame order within a
+    pair; `pair_offsets[key]:pair_offsets[key + 1]` is the contiguous run
+    of pair `key`, so name lookups slice straight to the matching rows.
+    `sorted_years` holds the distinct years present.
+    """
+
+    state_codes: np.ndarray
+    district_codes: np.ndarray
+    crop_codes: np.ndarray
+    years: np.ndarray
+    production: np.ndarray
+    states: pd.Index
+    districts: pd.Index
+    crops: pd.Index
+    pair_offsets: np.ndarray
+    sorted_years: np.ndarray
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, schema: SchemaMap) -> "DistrictArrays":
+        state_codes, states = _group_codes(df[schema.state])
+        district_codes, districts = _group_codes(df[schema.district])
+        crop_codes, crops = _group_codes(df[schema.crop])
+        # Missing names (code -1) take a trailing slot of their own, which `rows` never selects
+        s_keys = np.where(state_codes < 0, len(states), state_codes).astype(np.int64)
+        c_keys = np.where(crop_codes < 0, len(crops), crop_codes).astype(np.int64)
+        keys = s_keys * (len(crops) + 1) + c_keys
+        order = np.argsort(keys, kind="stable")
+        n_pairs = (len(states) + 1) * (len(crops) + 1)
+        years = _year_array(df[schema.year])[order]
+        production = _narrow_float(pd.to_numeric(df[schema.production], errors="coerce").to_numpy())
+        # Taking rows in pair order also leaves every array a contiguous stride-1 copy for the scan kernels
+        return cls(
+            state_codes=state_codes[order],
+            district_codes=district_codes[order],
+            crop_codes=crop_codes[order],
+            years=years,
+            production=production[order],
+            states=states,
+            districts=districts,
+            crops=crops,
+            pair_offsets=np.searchsorted(keys[order], np.arange(n_pairs + 1)),
+            sorted_years=np.unique(years[~np.isnan(years)] if years.dtype.kind == "f" else years),
+        )
+
+    def __len__(self) -> int:
+        return len(self.years)
+
+    def rows(self, state: str, crop: str) -> np.ndarray:
+        """Positions (in these arrays) of rows whose names `_contains` both needles, ascending."""
+        s_hits = np.flatnonzero(_category_hits(self.states, state))
+        c_hits = np.flatnonzero(_category_hits(self.crops, crop))
+        wanted = (s_hits[:, None] * (len(self.crops) + 1) + c_hits[None, :]).ravel()
+        starts, ends = self.pair_offsets[wanted], self.pair_offsets[wanted + 1]
+        slices = [np.arange(a, b) for a, b in zip(starts, ends) if b > a]
+        return np.concatenate(slices) if slices else np.empty(0, dtype=np.intp)
+
+    def year_totals(self, rows: np.ndarray, year) -> Tuple[pd.Index, np.ndarray]:
+        """Districts with records among `rows` in `year` (groupby order) and their production totals."""
+        sums = np.zeros(len(self.districts), dtype=np.float64 if self.production.dtype.kind == "f" else self.production.dtype)
+        counts = np.zeros(len(self.districts), dtype=np.int64)
+        _accumulate_year(rows, self.district_codes, self.years, self.production, float(year), sums, counts)
+        present = np.flatnonzero(counts)
+        return self.districts[present], sums[present]
+
+    def year_breakdown(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """District codes, years and production sums per (district, year) among `rows`, in groupby order."""
+        years = self.years[rows]
+        year_values = np.unique(years[years == years])
+        year_codes = np.searchsorted(year_values, years)
+        year_codes[years != years] = -1
+        # One pass into a flat (district, year) grid; its cell order is groupby's order
+        n_years = len(year_values)
+        sums = np.zeros(len(self.districts) * n_years, dtype=np.float64 if self.production.dtype.kind == "f" else self.production.dtype)
+        counts = np.zeros(len(sums), dtype=np.int64)
+        _accumulate_grid(self.district_codes[rows], year_codes, self.production[rows], n_years, sums, counts)
+        present = np.flatnonzero(counts)
+        return present // max(n_years, 1), year_values[present % max(n_years, 1)], sums[present]
+
+
+def _serialized(method):
+    """Run a cache-filling method under the executor's load lock.
+
+    Plan steps run concurrently; this makes each dataset load (and
+    conversion) happen once, with later callers reading the filled cache.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._load_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _pl_contains(col: str, needle: str):
+    """Polars counterpart of `_contains`; missing values never match, as with `na=False`."""
+    text = pl.col(col).cast(pl.Utf8)
+    return text.str.to_lowercase().str.contains(needle.lower(), literal=True).fill_null(False)
+
 
 class QueryExecutor:
     def __init__(self, data_store):
         self.data_store = data_store
         self.fetcher = DataFetcher()
+        # Created on first use by the district fallback
+        self._discovery_client = None
+        # Held while filling the caches below (see `_serialized`)
+        self._load_lock = threading.RLock()
+        # Loaded source frames, filled lazily so a multi-step plan fetches each once
+        self._cache: Dict[str, pd.DataFrame] = {}
+        # (data store name, numeric) -> (stored object, prepared DataFrame), rebuilt if the store replaces it
+        self._store_frames: Dict[Tuple[str, bool], Tuple[Any, pd.DataFrame]] = {}
+        # Column arrays of the cached district frame, built with it, and the frame they were built from
+        self._district_arrays: Optional[DistrictArrays] = None
+        self._district_source: Optional[pd.DataFrame] = None
+        # Sorted distinct years of the cached rainfall frame, found with it
+        self._rainfall_years: List[Any] = []
+        # Source name -> (source object, prepared Polars frame + columns, or None if unusable)
+        self._polars_cache: Dict[str, Tuple[Any, Optional[tuple]]] = {}
+
+    def clear_cache(self) -> None:
+        """Forget loaded datasets (call after the data store or config changes)."""
+        self._cache.clear()
+        self._store_frames.clear()
+        self._district_arrays = None
+        self._district_source = None
+        self._rainfall_years = []
+        self._polars_cache.clear()
+
+    @_serialized
+    def _store_dataset(self, name: str, numeric: bool = False) -> Optional[pd.DataFrame]:
+        """`data_store.get_dataset(name)`, materialized and prepared once per stored dataset.
+
+        With `numeric`, a long-format frame (state, crop, production and
+        year all present) also has production/year parsed with
+        `pd.to_numeric(errors="coerce")`, once rather than per question.
+        """
+        data = self.data_store.get_table(name)
+        if data is None:
+            return None
+        key = (name, numeric)
+        entry = self._store_frames.get(key)
+        if entry is None or entry[0] is not data:
+            if numeric:
+                df = self._store_dataset(name)
+                schema = _resolve_schema(df)
+                if all([schema.state, schema.crop, schema.production, schema.year]):
+                    for col in (schema.production, schema.year):
+                        df[col] = pd.to_numeric(df[col], errors="coerce")
+            else:
+                df = _with_categorical_names(data) if isinstance(data, pd.DataFrame) else _arrow_frame(data)
+            entry = (data, df)
+            self._store_frames[key] = entry
+        return entry[1].copy(deep=False)
+
+    def _cached(self, key: str) -> Optional[pd.DataFrame]:
+        df = self._cache.get(key)
+        # Shallow copy: compute steps assign converted columns, which must not leak into the cache
+        return None if df is None else df.copy(deep=False)
 
     def execute(self, plan: Dict[str, Any]) -> Dict[str, Any]:
-        results: Dict[str, Any] = {}
-        for step in plan.get("steps", []):
+        tasks = []
+        for step in plan.get("steps", ()):
             if isinstance(step, str):
                 continue
-            if step.get("type") == "compute_rainfall_compare":
-                results["rainfall_compare"] = self._compute_rainfall_compare(
-                    step["state1"], step["state2"], step["years"]
-                )
-            if step.get("type") == "compute_top_crops":
-                results["top_crops"] = self._compute_top_crops(
-                    step["state1"], step["state2"], step["top_m"], step["crop_type"]
-                )
-            if step.get("type") == "compute_district_crop_extrema":
-                results["district_crop_extrema"] = self._compute_district_crop_extrema(
-                    step["state_max"], step["crop_max"], step["state_min"], step["crop_min"]
-                )
-            if step.get("type") == "compute_top_crops_state":
-                results["top_crops_state"] = self._compute_top_crops_state(
-                    step["state"], step["top_n"], step["years"]
-                )
-            if step.get("type") == "compute_district_highest_crop_year":
-                results["district_highest_crop_year"] = self._compute_district_highest_crop_year(
-                    step["state"], step["crop"], step["year"]
-                )
-            if step.get("type") == "compute_district_crop_comparison":
-                results["district_crop_comparison"] = self._compute_district_crop_comparison(
-                    step["state"], step["crop"], step["years"]
-                )
+            handler = self._HANDLERS.get(step.get("type"))
+            if handler is None:
+                continue
+            compute, arg_keys, result_key = handler
+            tasks.append((result_key, compute, tuple(step[k] for k in arg_keys)))
+
+        results: Dict[str, Any] = {}
+        if len(tasks) <= 1:
+            for result_key, compute, args in tasks:
+                results[result_key] = compute(self, *args)
+            return {"plan": plan, "answer_data": results}
+
+        # Steps only read the (lock-filled) caches, and mostly run in GIL-releasing pandas/NumPy code
+        futures = [(key, _STEP_POOL.submit(compute, self, *args)) for key, compute, args in tasks]
+        for result_key, future in futures:
+            results[result_key] = future.result()
         return {"plan": plan, "answer_data": results}
 
+    @_serialized
     def _load_crop_production(self) -> pd.DataFrame:
-        cfg = get_config()
-        rid = cfg.crop_production_resource_id
-        return self.fetcher.fetch_dataset(rid)
+        if "crop" not in self._cache:
+            cfg = get_config()
+            rid = cfg.crop_production_resource_id
+            self._cache["crop"] = _with_categorical_names(self.fetcher.fetch_dataset(rid))
+        return self._cached("crop")
 
     def _validate_crop_production_schema(self, df: pd.DataFrame) -> bool:
         """Validate that a dataframe has crop production schema."""
         if df is None or df.empty:
             return False
-        
-        def find_col(candidates):
-            for c in candidates:
-                if c in df.columns:
-                    return c
-            lower_map = {c.lower(): c for c in df.columns}
-            for c in candidates:
-                if c.lower() in lower_map:
-                    return lower_map[c.lower()]
-            return None
-        
+
         # Check for required columns (state/district/crop/production)
-        state_col = find_col(["State_Name", "STATE", "State", "STATE/UT", "STATE_UT_NAME", "State Name", "state"])
-        district_col = find_col(["District_Name", "District", "DISTRICT", "District Name", "district"])
-        crop_col = find_col(["Crop", "CROP", "Crop_Name", "Commodity", "CROP_NAME", "crop"])
-        prod_col = find_col(["Production", "PRODUCTION", "Prodn", "PROD", "production_tonnes", "Prod", "production"])
+        schema = _resolve_schema(df)
+        state_col = schema.state
+        district_col = schema.district
+        crop_col = schema.crop
+        prod_col = schema.production
         
         # For district crop production, we need at least state, district, crop, and production
         return bool(state_col and district_col and crop_col and prod_col)
 
+    @_serialized
     def _load_district_crop_production(self) -> pd.DataFrame:
         """Load district crop production dataset with schema validation and fallback."""
-        # Try data store first
-        df = self.data_store.get_dataset('crop_production_district_season')
+        cached = self._cached("district")
+        if cached is not None:
+            return cached
+
+        # Try data store first (converted here once per executor, then cached below)
+        data = self.data_store.get_table('crop_production_district_season')
+        df = None
+        if data is not None:
+            df = _with_categorical_names(data) if isinstance(data, pd.DataFrame) else _arrow_frame(data)
         
         # Validate schema if dataset exists
         if df is not None and not df.empty and self._validate_crop_production_schema(df):
-            return df
+            return self._remember_district(df)
         
         # Fallback: fetch directly from API (try CKAN first, then data.gov.in)
         cfg = get_config()
@@ -88,15 +614,16 @@ class QueryExecutor:
         if cfg.district_crop_production_resource_id:
             resource_ids_to_try.append(cfg.district_crop_production_resource_id)
         
-        # Try auto-discovery as fallback
-        try:
-            from data_discovery.ckan_client import DataGovInClient
-            client = DataGovInClient()
-            discovered_id = client.discover_district_crop_production_resource_id()
-            if discovered_id and discovered_id not in resource_ids_to_try:
-                resource_ids_to_try.append(discovered_id)
-        except Exception:
-            pass
+        # Try auto-discovery as fallback (the client caches discovery results)
+        if DataGovInClient is not None:
+            try:
+                if self._discovery_client is None:
+                    self._discovery_client = DataGovInClient()
+                discovered_id = self._discovery_client.discover_district_crop_production_resource_id()
+                if discovered_id and discovered_id not in resource_ids_to_try:
+                    resource_ids_to_try.append(discovered_id)
+            except Exception:
+                pass
         
         # Try each resource ID with both CKAN and data.gov.in endpoints
         for resource_id in resource_ids_to_try:
@@ -112,7 +639,7 @@ class QueryExecutor:
                         df_fetched,
                         {'id': resource_id, 'name': 'District-wise Season-wise Crop Production'}
                     )
-                    return df_fetched
+                    return self._remember_district(df_fetched)
             except Exception:
                 pass
             
@@ -128,19 +655,64 @@ class QueryExecutor:
                         df_fetched,
                         {'id': resource_id, 'name': 'District-wise Season-wise Crop Production'}
                     )
-                    return df_fetched
+                    return self._remember_district(df_fetched)
             except Exception:
                 # Try next resource ID
                 continue
         
         return pd.DataFrame()
 
+    def _remember_district(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Cache a validated district frame with production/year numeric and names categorical."""
+        schema = _resolve_schema(df)
+        # Few distinct names over many rows: filters and groupbys then work on integer codes
+        df = _with_categorical_names(df)
+        # Parse once here rather than in every district computation
+        if schema.production:
+            df[schema.production] = pd.to_numeric(df[schema.production], errors="coerce")
+        if schema.year:
+            # Complete integer years fit int16; with gaps they stay float so NaN still means missing
+            df[schema.year] = pd.to_numeric(df[schema.year], errors="coerce", downcast="integer")
+        self._district_arrays = None
+        self._district_source = None
+        if all([schema.state, schema.district, schema.crop, schema.production, schema.year]):
+            self._district_arrays = DistrictArrays.from_frame(df, schema)
+            self._district_source = df
+        self._cache["district"] = df
+        return self._cached("district")
+
+    def _district_view(self, df: pd.DataFrame, schema: SchemaMap) -> DistrictArrays:
+        """Arrays for `df`: the ones built at load when `df` is a copy of that frame, else extracted now."""
+        source = self._district_source
+        if (
+            self._district_arrays is not None
+            and source is not None
+            and len(df) == len(source)
+            and df.index.equals(source.index)
+            and all(
+                _same_column_data(df, source, col)
+                for col in (schema.state, schema.district, schema.crop, schema.production, schema.year)
+            )
+        ):
+            return self._district_arrays
+        return DistrictArrays.from_frame(df, schema)
+
+    @_serialized
     def _load_rainfall(self) -> pd.DataFrame:
         cfg = get_config()
         rid = cfg.rainfall_resource_id
         if not rid:
             return pd.DataFrame()
-        return self.fetcher.fetch_dataset(rid)
+        if "rainfall" not in self._cache:
+            df = _with_categorical_names(self.fetcher.fetch_dataset(rid))
+            # Parse year/annual once and keep the distinct years, rather than per question
+            _, yc, ac = _resolve_rainfall_columns(tuple(str(c) for c in df.columns))
+            for col in (yc, ac):
+                if col:
+                    df[col] = pd.to_numeric(df[col], errors="coerce")
+            self._rainfall_years = sorted(df[yc].dropna().unique()) if yc else []
+            self._cache["rainfall"] = df
+        return self._cached("rainfall")
 
     def _compute_rainfall_compare(self, state1: str, state2: str, years: int) -> Dict[str, Any]:
         df = self._load_rainfall()
@@ -148,44 +720,17 @@ class QueryExecutor:
             return {"note": "No rainfall dataset configured"}
 
         # Try common column names (case-insensitive)
-        state_col_candidates: List[str] = [
-            "STATE",
-            "STATE_UT_NAME",
-            "SUBDIVISION",
-            "State",
-            "STATE/UT",
-            "subdivision",
-        ]
-        year_col_candidates: List[str] = ["YEAR", "Year", "year", "Year", "YEAR"]
-        annual_col_candidates: List[str] = ["ANNUAL", "Annual", "ANN", "Rainfall", "annual"]
-
-        def pick(cols: List[str]) -> str | None:
-            # exact match first
-            for c in cols:
-                if c in df.columns:
-                    return c
-            # case-insensitive fallback
-            lower_map = {c.lower(): c for c in df.columns}
-            for c in cols:
-                lc = c.lower()
-                if lc in lower_map:
-                    return lower_map[lc]
-            return None
-
-        sc = pick(state_col_candidates)
-        yc = pick(year_col_candidates)
-        ac = pick(annual_col_candidates)
+        sc, yc, ac = _resolve_rainfall_columns(tuple(str(c) for c in df.columns))
         if not (sc and yc and ac):
             return {"error": "Rainfall dataset has unexpected schema", "columns": list(df.columns)}
 
-        df[yc] = pd.to_numeric(df[yc], errors="coerce")
-        df[ac] = pd.to_numeric(df[ac], errors="coerce")
-        recent_years = sorted(df[yc].dropna().unique())[-years:]
-        sub = df[df[yc].isin(recent_years)]
+        # Recent years are the tail of the sorted years, so one comparison selects their rows
+        recent_years = self._rainfall_years[-years:]
+        sub = df[df[yc] >= recent_years[0]] if recent_years else df.iloc[:0]
 
         out = {}
         for s in [state1, state2]:
-            s_sub = sub[sub[sc].str.contains(s, case=False, na=False)]
+            s_sub = sub[_contains(sub[sc], s)]
             out[s] = {
                 "years": recent_years,
                 "avg_annual_mm": float(s_sub[ac].mean()) if not s_sub.empty else None,
@@ -194,24 +739,33 @@ class QueryExecutor:
 
     def _compute_top_crops(self, state1: str, state2: str, top_m: int, crop_type: str) -> Dict[str, Any]:
         df = self._load_crop_production()
+        source = self._polars_frame("crop", self._cache["crop"]) if pl is not None and not df.empty else None
+        if source is not None:
+            frame, _, state_col, crop_col, prod_col, _ = source
+            out = {}
+            for s in [state1, state2]:
+                rows = frame.lazy().filter(_pl_contains(state_col, s))
+                if crop_type:
+                    rows = rows.filter(_pl_contains(crop_col, crop_type))
+                out[s] = (
+                    rows.drop_nulls(crop_col)
+                    .group_by(crop_col)
+                    .agg(pl.col(prod_col).sum())
+                    .sort(crop_col)
+                    .sort(prod_col, descending=True, maintain_order=True)
+                    .head(top_m)
+                    .collect()
+                    .to_dicts()
+                )
+            return out
         if df.empty:
             return {"note": "Crop production dataset empty"}
 
         # Normalize likely columns across variants
-        def find_col(candidates):
-            for c in candidates:
-                if c in df.columns:
-                    return c
-            # case-insensitive match
-            lower_map = {c.lower(): c for c in df.columns}
-            for c in candidates:
-                if c.lower() in lower_map:
-                    return lower_map[c.lower()]
-            return None
-
-        state_col = find_col(["State_Name", "STATE", "State", "STATE/UT", "STATE_UT_NAME", "State Name"])
-        crop_col = find_col(["Crop", "CROP", "Crop_Name", "Commodity", "CROP_NAME"])
-        prod_col = find_col(["Production", "PRODUCTION", "Prodn", "PROD", "production_tonnes"]) or "Production"
+        schema = _resolve_schema(df)
+        state_col = schema.state
+        crop_col = schema.crop
+        prod_col = schema.production or "Production"
 
         for col in [prod_col, "Area"]:
             if col in df.columns:
@@ -222,16 +776,10 @@ class QueryExecutor:
 
         out = {}
         for s in [state1, state2]:
-            s_df = df[df[state_col].astype(str).str.contains(s, case=False, na=False)]
+            s_df = df[_contains(df[state_col], s)]
             if crop_type:
-                s_df = s_df[s_df[crop_col].astype(str).str.contains(crop_type, case=False, na=False)]
-            top = (
-                s_df.groupby(crop_col, as_index=False)[prod_col]
-                .sum()
-                .sort_values(prod_col, ascending=False)
-                .head(top_m)
-            )
-            out[s] = top.to_dict(orient="records")
+                s_df = s_df[_contains(s_df[crop_col], crop_type)]
+            out[s] = _top_group_sums(s_df[crop_col], s_df[prod_col], top_m, crop_col, prod_col)
         return out
 
     def _compute_district_crop_extrema(self, state_max: str, crop_max: str, state_min: str, crop_min: str) -> Dict[str, Any]:
@@ -245,47 +793,33 @@ class QueryExecutor:
             }
 
         # Flexible column detection
-        def find_col(candidates):
-            for c in candidates:
-                if c in df.columns:
-                    return c
-            lower_map = {c.lower(): c for c in df.columns}
-            for c in candidates:
-                if c.lower() in lower_map:
-                    return lower_map[c.lower()]
-            return None
-
-        state_col = find_col(["State_Name", "STATE", "State", "STATE/UT", "STATE_UT_NAME", "State Name"])
-        district_col = find_col(["District_Name", "District", "DISTRICT", "District Name"])
-        crop_col = find_col(["Crop", "CROP", "Crop_Name", "Commodity", "CROP_NAME"])
-        prod_col = find_col(["Production", "PRODUCTION", "Prodn", "PROD", "production_tonnes", "Prod"])
-        year_col = find_col(["Year", "YEAR", "year"])
+        schema = _resolve_schema(df)
+        state_col = schema.state
+        district_col = schema.district
+        crop_col = schema.crop
+        prod_col = schema.production
+        year_col = schema.year
 
         if not all([state_col, district_col, crop_col, prod_col, year_col]):
             return {"error": "District dataset schema unexpected", "columns": list(df.columns)}
 
-        # Normalize numeric
-        df[prod_col] = pd.to_numeric(df[prod_col], errors="coerce")
-        df[year_col] = pd.to_numeric(df[year_col], errors="coerce")
+        view = self._district_view(df, schema)
 
         def extrema_for(state: str, crop: str, mode: str):
-            sub = df[
-                df[state_col].astype(str).str.contains(state, case=False, na=False)
-                & df[crop_col].astype(str).str.contains(crop, case=False, na=False)
-            ]
-            if sub.empty:
+            rows = view.rows(state, crop)
+            if not len(rows):
                 return None
             # most recent year for this subset
-            years = sorted(sub[year_col].dropna().unique())
-            if not years:
+            years = view.years[rows]
+            if np.isnan(years).all():
                 return None
-            recent = years[-1]
-            sub_recent = sub[sub[year_col] == recent]
-            grouped = (
-                sub_recent.groupby(district_col, as_index=False)[prod_col].sum().sort_values(prod_col, ascending=(mode=="min"))
-            )
-            row = grouped.iloc[0]
-            return {"state": state, "crop": crop, "district": str(row[district_col]), "year": int(recent), "production": float(row[prod_col])}
+            recent = np.nanmax(years)
+            districts, totals = view.year_totals(rows, recent)
+            if not len(totals):
+                return None
+            # One scan, first district on ties (like idxmin/idxmax), instead of sorting all totals
+            best = int(np.argmin(totals)) if mode == "min" else int(np.argmax(totals))
+            return {"state": state, "crop": crop, "district": str(districts[best]), "year": int(recent), "production": float(totals[best])}
 
         return {
             "max": extrema_for(state_max, crop_max, mode="max"),
@@ -293,30 +827,26 @@ class QueryExecutor:
         }
 
     def _compute_top_crops_state(self, state: str, top_n: int, years: int) -> Dict[str, Any]:
+        if pl is not None:
+            result = self._top_crops_state_polars(state, top_n, years)
+            if result is not None:
+                return result
+
         # Try data store datasets (loaded during initialization) - try district first (has state data), then major crops
-        df = self.data_store.get_dataset('crop_production_district_season')
+        df = self._store_dataset('crop_production_district_season', numeric=True)
         if df is None or df.empty:
-            df = self.data_store.get_dataset('crop_production_major_crops')
+            df = self._store_dataset('crop_production_major_crops', numeric=True)
         if df is None or df.empty:
             # Fallback to direct API fetch
             df = self._load_crop_production()
         if df.empty:
             return {"error": "Crop production dataset empty", "state": state}
 
-        def find_col(candidates):
-            for c in candidates:
-                if c in df.columns:
-                    return c
-            lower_map = {c.lower(): c for c in df.columns}
-            for c in candidates:
-                if c.lower() in lower_map:
-                    return lower_map[c.lower()]
-            return None
-
-        state_col = find_col(["State_Name", "STATE", "State", "STATE/UT", "STATE_UT_NAME", "State Name"])
-        crop_col = find_col(["Crop", "CROP", "Crop_Name", "Commodity", "CROP_NAME"])
-        prod_col = find_col(["Production", "PRODUCTION", "Prodn", "PROD", "production_tonnes"]) or "Production"
-        year_col = find_col(["Year", "YEAR", "year", "_year"])
+        schema = _resolve_schema(df)
+        state_col = schema.state
+        crop_col = schema.crop
+        prod_col = schema.production or "Production"
+        year_col = schema.year or _match_column(df.columns, ("_year",))
 
         # Check if this is a "long format" dataset (State, Crop, Year, Production columns)
         if state_col and crop_col and year_col and prod_col:
@@ -324,50 +854,50 @@ class QueryExecutor:
             df[prod_col] = pd.to_numeric(df[prod_col], errors="coerce")
             df[year_col] = pd.to_numeric(df[year_col], errors="coerce")
             
-            # Filter by state
-            state_filter = df[state_col].astype(str).str.contains(state, case=False, na=False)
-            filtered = df[state_filter].copy()
+            # Build one row mask step by step and slice the frame once, on the columns used below
+            mask = _contains(df[state_col], state).to_numpy()
             
-            if filtered.empty:
+            if not mask.any():
                 return {"error": f"No data found for {state}", "state": state, "debug": {"total_rows": len(df), "sample_state_values": df[state_col].astype(str).unique()[:5].tolist() if state_col in df.columns else []}}
             
             # Get recent years
-            all_years = sorted(filtered[year_col].dropna().unique())
+            all_years = sorted(df[year_col][mask].dropna().unique())
             recent_years = all_years[-years:] if len(all_years) >= years else all_years
             
-            # Filter by recent years
-            filtered = filtered[filtered[year_col].isin(recent_years)]
+            # Keep recent years only: they are the tail of the sorted distinct years, so one comparison selects them
+            if recent_years:
+                mask = mask & (df[year_col] >= recent_years[0]).to_numpy(dtype=bool, na_value=False)
+            else:
+                mask = np.zeros_like(mask)
             
-            if filtered.empty:
+            if not mask.any():
                 return {"error": f"No data found for {state} in recent {years} years", "state": state, "debug": {"available_years": all_years, "requested_years": recent_years}}
             
             # Drop rows with null/missing crop or production values
-            filtered = filtered.dropna(subset=[crop_col, prod_col])
+            mask = mask & df[crop_col].notna().to_numpy() & df[prod_col].notna().to_numpy()
+            filtered = df.loc[mask, [crop_col, prod_col, year_col]]
             
             # Aggregate by crop across years (sum production for each crop)
             # Make sure crop_col values are strings for grouping
-            filtered[crop_col] = filtered[crop_col].astype(str).str.strip()
-            filtered = filtered[filtered[crop_col] != '']  # Remove empty crop names
+            filtered[crop_col] = _stripped_names(filtered[crop_col])
+            named = (filtered[crop_col] != '').to_numpy()  # Remove empty crop names
+            if not named.all():
+                filtered = filtered[named]
             
             if filtered.empty:
                 return {"error": f"No valid crop data found for {state} in recent {years} years", "state": state}
             
             # Group by crop and sum production
-            top = (
-                filtered.groupby(crop_col, as_index=False)[prod_col]
-                .sum()
-                .sort_values(prod_col, ascending=False)
-                .head(top_n)
-            )
+            top = _top_group_sums(filtered[crop_col], filtered[prod_col], top_n, crop_col, prod_col)
             
             # Debug: If we got fewer crops than expected, include debug info
-            unique_crops_count = filtered[crop_col].nunique() if crop_col in filtered.columns else 0
+            unique_crops_count = filtered[crop_col].nunique()
             
             result = {
                 "state": state,
                 "top_n": top_n,
                 "years": int(years),
-                "crops": top.to_dict(orient="records"),
+                "crops": top,
                 "year_range": [int(y) for y in recent_years],
             }
             
@@ -377,8 +907,8 @@ class QueryExecutor:
                     "total_rows_after_filter": len(filtered),
                     "unique_crops_found": unique_crops_count,
                     "crops_returned": len(top),
-                    "sample_crops": filtered[crop_col].unique()[:20].tolist() if crop_col in filtered.columns else [],
-                    "sample_data": filtered[[crop_col, prod_col, year_col]].head(20).to_dict(orient="records") if all(c in filtered.columns for c in [crop_col, prod_col, year_col]) else []
+                    "sample_crops": filtered[crop_col].unique()[:20].tolist(),
+                    "sample_data": filtered.head(20).to_dict(orient="records")
                 }
             
             return result
@@ -401,29 +931,19 @@ class QueryExecutor:
         # Try to filter by state if state column exists, even in wide format
         if state_col:
             # Wide format but has state column - filter by state first
-            state_filter = df[state_col].astype(str).str.contains(state, case=False, na=False)
+            state_filter = _contains(df[state_col], state)
             df = df[state_filter].copy()
             if df.empty:
                 return {"error": f"No data found for {state} in wide format dataset", "state": state}
         
         if "_year" in df.columns or (year_col and year_col.startswith("_")):
             # Wide format: each row is a year, columns are crop names
-            year_col = "_year" if "_year" in df.columns else find_col(["_year", "Year", "YEAR", "year"])
+            year_col = "_year" if "_year" in df.columns else _match_column(df.columns, ("_year",) + _COLUMN_CANDIDATES["year"])
             if year_col and year_col in df.columns:
                 # Get all years (may be strings like "2014-15" or numeric)
                 years_raw = df[year_col].dropna().unique()
-                # Try to extract numeric year from strings like "2014-15" -> 2014
-                years_numeric = []
-                for y in years_raw:
-                    try:
-                        # If it's already numeric
-                        ynum = int(float(y))
-                        years_numeric.append(ynum)
-                    except (ValueError, TypeError):
-                        # Try to extract first 4 digits if string like "2014-15"
-                        match = re.search(r'(\d{4})', str(y))
-                        if match:
-                            years_numeric.append(int(match.group(1)))
+                # Numeric years as-is, strings like "2014-15" -> 2014
+                years_numeric = _year_numbers(pd.Series(years_raw)).dropna().astype(int).tolist()
                 
                 if not years_numeric:
                     return {"error": "Could not parse years from dataset", "year_column": year_col, "sample_values": list(years_raw[:5])}
@@ -432,38 +952,24 @@ class QueryExecutor:
                 recent_years = sorted(years_numeric)[-years:]
                 # Filter rows - match by extracting year from the year column
                 df_recent = df.copy()
-                def extract_year(val):
-                    try:
-                        if pd.api.types.is_numeric_dtype(type(val)):
-                            return int(float(val))
-                        match = re.search(r'(\d{4})', str(val))
-                        return int(match.group(1)) if match else None
-                    except (ValueError, TypeError, AttributeError):
-                        return None
-                
-                df_recent['_year_numeric'] = df_recent[year_col].apply(extract_year)
+                df_recent['_year_numeric'] = _year_numbers(df_recent[year_col])
                 df_recent = df_recent[df_recent['_year_numeric'].isin(recent_years)].copy()
                 
-                # Melt to long format: year -> crop -> production
-                id_cols = [year_col]
-                if state_col and state_col in df_recent.columns:
-                    id_cols.append(state_col)
                 # All other numeric columns are crops (exclude the helper column)
                 crop_cols = [c for c in df_recent.columns if c not in [year_col, '_year_numeric'] + ([state_col] if state_col else []) and pd.api.types.is_numeric_dtype(df_recent[c])]
                 
                 if not crop_cols:
                     return {"error": "No crop production columns found in wide format dataset", "columns": list(df.columns)}
                 
-                # Melt the dataframe
-                df_long = df_recent.melt(id_vars=id_cols, value_vars=crop_cols, var_name="Crop", value_name="Production")
-                df_long["Production"] = pd.to_numeric(df_long["Production"], errors="coerce")
-                
-                # Aggregate by crop across years
+                # Total each crop column over the recent rows (columns are already numeric)
+                totals = df_recent[crop_cols].sum() if not df_recent.empty else pd.Series(dtype=float)
+                # Name order first so ties rank as they did when grouping by crop
                 top = (
-                    df_long.groupby("Crop", as_index=False)["Production"]
-                    .sum()
-                    .sort_values("Production", ascending=False)
+                    totals.sort_index()
+                    .sort_values(ascending=False)
                     .head(top_n)
+                    .rename_axis("Crop")
+                    .reset_index(name="Production")
                 )
                 
                 return {
@@ -474,38 +980,133 @@ class QueryExecutor:
                     "year_range": sorted(recent_years),
                 }
 
+    def _polars_source(self) -> Optional[tuple]:
+        """Prepared Polars frame for the same source `_compute_top_crops_state` would read."""
+        for name in ('crop_production_district_season', 'crop_production_major_crops'):
+            data = self.data_store.get_table(name)
+            if data is not None and len(data):
+                return self._polars_frame(name, data)
+        self._load_crop_production()
+        data = self._cache.get("crop")
+        if data is None or data.empty:
+            return None
+        return self._polars_frame("crop", data)
+
+    @_serialized
+    def _polars_frame(self, name: str, data) -> Optional[tuple]:
+        entry = self._polars_cache.get(name)
+        if entry is not None and entry[0] is data:
+            return entry[1]
+
+        df = data if isinstance(data, pd.DataFrame) else data.to_pandas()
+        schema = _resolve_schema(df)
+        cols = (
+            schema.state,
+            schema.crop,
+            schema.production or "Production",
+            schema.year or _match_column(df.columns, ("_year",)),
+        )
+        prepared = None
+        # Only the long-format layout is handled here; everything else stays on the pandas path
+        if all(cols) and cols[2] in df.columns:
+            sub = pd.DataFrame({c: df[c] for c in cols})
+            # Same coercion as the pandas path, done once per source instead of per question
+            for c in cols[2:]:
+                sub[c] = pd.to_numeric(sub[c], errors="coerce")
+            try:
+                # Names as plain strings: Polars categoricals don't sort lexically on every version
+                frame = pl.from_pandas(sub).with_columns(pl.col(pl.Categorical).cast(pl.Utf8))
+                prepared = (frame, len(df)) + cols
+            except Exception:
+                prepared = None
+        self._polars_cache[name] = (data, prepared)
+        return prepared
+
+    def _top_crops_state_polars(self, state: str, top_n: int, years: int) -> Optional[Dict[str, Any]]:
+        """Long-format branch of `_compute_top_crops_state` as lazy Polars queries.
+
+        Returns None when the source isn't long format (or Polars can't hold
+        it) so the caller falls back to pandas; results match that path.
+        """
+        source = self._polars_source()
+        if source is None:
+            return None
+        frame, total_rows, state_col, crop_col, prod_col, year_col = source
+
+        in_state = frame.lazy().filter(_pl_contains(state_col, state))
+
+        state_years = in_state.select(year_col).collect()
+        if state_years.height == 0:
+            state_text = pl.col(state_col).cast(pl.Utf8)
+            sample_states = frame.select(state_text.unique(maintain_order=True).head(5)).to_series().to_list()
+            # Missing states are NaN in the pandas path's astype(str) sample
+            sample_states = [float("nan") if value is None else value for value in sample_states]
+            return {"error": f"No data found for {state}", "state": state, "debug": {"total_rows": total_rows, "sample_state_values": sample_states}}
+
+        all_years = sorted(state_years.get_column(year_col).drop_nulls().unique().to_list())
+        recent_years = all_years[-years:] if len(all_years) >= years else all_years
+
+        recent = in_state.filter(pl.col(year_col).is_in(recent_years))
+        valid = (
+            recent.drop_nulls([crop_col, prod_col])
+            .with_columns(pl.col(crop_col).cast(pl.Utf8).str.strip_chars())
+            .filter(pl.col(crop_col) != "")
+        )
+        recent_count, filtered = pl.collect_all([recent.select(pl.len()), valid])
+        if recent_count.item() == 0:
+            return {"error": f"No data found for {state} in recent {years} years", "state": state, "debug": {"available_years": all_years, "requested_years": recent_years}}
+        if filtered.height == 0:
+            return {"error": f"No valid crop data found for {state} in recent {years} years", "state": state}
+
+        # Ties keep pandas' sorted-key order
+        top = (
+            filtered.group_by(crop_col)
+            .agg(pl.col(prod_col).sum())
+            .sort(crop_col)
+            .sort(prod_col, descending=True, maintain_order=True)
+            .head(top_n)
+        )
+
+        result = {
+            "state": state,
+            "top_n": top_n,
+            "years": int(years),
+            "crops": top.to_dicts(),
+            "year_range": [int(y) for y in recent_years],
+        }
+        if top.height < top_n:
+            result["debug_info"] = {
+                "total_rows_after_filter": filtered.height,
+                "unique_crops_found": filtered.get_column(crop_col).n_unique(),
+                "crops_returned": top.height,
+                "sample_crops": filtered.get_column(crop_col).unique(maintain_order=True).head(20).to_list(),
+                "sample_data": filtered.select(crop_col, prod_col, year_col).head(20).to_dicts(),
+            }
+        return result
+
     def _try_state_level_fallback(self, state: str, crop: str, year: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """Try to provide state-level crop data as fallback when district data is unavailable."""
         try:
             # Try to get major crops dataset
-            df = self.data_store.get_dataset('crop_production_major_crops')
+            df = self._store_dataset('crop_production_major_crops')
             if df is None or df.empty:
                 df = self._load_crop_production()
             
             if df.empty:
                 return None
-            
-            def find_col(candidates):
-                for c in candidates:
-                    if c in df.columns:
-                        return c
-                lower_map = {c.lower(): c for c in df.columns}
-                for c in candidates:
-                    if c.lower() in lower_map:
-                        return lower_map[c.lower()]
-                return None
-            
-            state_col = find_col(["State_Name", "STATE", "State", "STATE/UT", "STATE_UT_NAME", "State Name"])
-            crop_col = find_col(["Crop", "CROP", "Crop_Name", "Commodity", "CROP_NAME"])
-            prod_col = find_col(["Production", "PRODUCTION", "Prodn", "PROD", "production_tonnes"])
-            year_col = find_col(["Year", "YEAR", "year"])
+
+            schema = _resolve_schema(df)
+            state_col = schema.state
+            crop_col = schema.crop
+            prod_col = schema.production
+            year_col = schema.year
             
             if not all([state_col, crop_col, prod_col]):
                 return None
             
             # Filter by state and crop
-            state_filter = df[state_col].astype(str).str.contains(state, case=False, na=False)
-            crop_filter = df[crop_col].astype(str).str.contains(crop, case=False, na=False)
+            state_filter = _contains(df[state_col], state)
+            crop_filter = _contains(df[crop_col], crop)
             filtered = df[state_filter & crop_filter]
             
             if year_col and year:
@@ -556,21 +1157,12 @@ class QueryExecutor:
                 ]
             }
 
-        def find_col(candidates):
-            for c in candidates:
-                if c in df.columns:
-                    return c
-            lower_map = {c.lower(): c for c in df.columns}
-            for c in candidates:
-                if c.lower() in lower_map:
-                    return lower_map[c.lower()]
-            return None
-
-        state_col = find_col(["State_Name", "STATE", "State", "STATE/UT", "STATE_UT_NAME", "State Name"])
-        district_col = find_col(["District_Name", "District", "DISTRICT", "District Name"])
-        crop_col = find_col(["Crop", "CROP", "Crop_Name", "Commodity", "CROP_NAME"])
-        prod_col = find_col(["Production", "PRODUCTION", "Prodn", "PROD", "production_tonnes", "Prod"])
-        year_col = find_col(["Year", "YEAR", "year"])
+        schema = _resolve_schema(df)
+        state_col = schema.state
+        district_col = schema.district
+        crop_col = schema.crop
+        prod_col = schema.production
+        year_col = schema.year
 
         if not all([state_col, district_col, crop_col, prod_col, year_col]):
             return {
@@ -592,18 +1184,11 @@ class QueryExecutor:
                 }
             }
 
-        # Normalize numeric
-        df[prod_col] = pd.to_numeric(df[prod_col], errors="coerce")
-        df[year_col] = pd.to_numeric(df[year_col], errors="coerce")
-
-        # Filter by state, crop, and year
-        filtered = df[
-            df[state_col].astype(str).str.contains(state, case=False, na=False)
-            & df[crop_col].astype(str).str.contains(crop, case=False, na=False)
-            & (df[year_col] == year)
-        ]
+        # Filter by state and crop, then total each district's records for the year
+        view = self._district_view(df, schema)
+        districts, totals = view.year_totals(view.rows(state, crop), year)
 
-        if filtered.empty:
+        if not len(totals):
             return {
                 "error": f"No data found for {state}, {crop}, year {year}",
                 "state": state,
@@ -611,17 +1196,15 @@ class QueryExecutor:
                 "year": year,
             }
 
-        # Group by district and sum production (in case of multiple records per district)
-        grouped = filtered.groupby(district_col, as_index=False)[prod_col].sum()
-        # Get district with highest production
-        max_row = grouped.loc[grouped[prod_col].idxmax()]
+        # Get district with highest production (first one on ties, like idxmax)
+        best = int(np.argmax(totals))
 
         return {
             "state": state,
             "crop": crop,
             "year": int(year),
-            "district": str(max_row[district_col]),
-            "production": float(max_row[prod_col]),
+            "district": str(districts[best]),
+            "production": float(totals[best]),
         }
 
     def _compute_district_crop_comparison(self, state: str, crop: str, years: int) -> Dict[str, Any]:
@@ -634,41 +1217,27 @@ class QueryExecutor:
                 "hint": "The district crop production resource ID may be incorrect or the dataset may not be accessible."
             }
 
-        def find_col(candidates):
-            for c in candidates:
-                if c in df.columns:
-                    return c
-            lower_map = {c.lower(): c for c in df.columns}
-            for c in candidates:
-                if c.lower() in lower_map:
-                    return lower_map[c.lower()]
-            return None
-
-        state_col = find_col(["State_Name", "STATE", "State", "STATE/UT", "STATE_UT_NAME", "State Name"])
-        district_col = find_col(["District_Name", "District", "DISTRICT", "District Name"])
-        crop_col = find_col(["Crop", "CROP", "Crop_Name", "Commodity", "CROP_NAME"])
-        prod_col = find_col(["Production", "PRODUCTION", "Prodn", "PROD", "production_tonnes", "Prod"])
-        year_col = find_col(["Year", "YEAR", "year"])
+        schema = _resolve_schema(df)
+        state_col = schema.state
+        district_col = schema.district
+        crop_col = schema.crop
+        prod_col = schema.production
+        year_col = schema.year
 
         if not all([state_col, district_col, crop_col, prod_col, year_col]):
             return {"error": "District dataset schema unexpected", "columns": list(df.columns)}
 
-        # Normalize numeric
-        df[prod_col] = pd.to_numeric(df[prod_col], errors="coerce")
-        df[year_col] = pd.to_numeric(df[year_col], errors="coerce")
-
-        # Get recent years
-        all_years = sorted(df[year_col].dropna().unique())
+        # Get recent years (distinct years are kept with the dataset's arrays)
+        view = self._district_view(df, schema)
+        all_years = list(view.sorted_years)
         recent_years = all_years[-years:] if len(all_years) >= years else all_years
 
-        # Filter by state and crop
-        filtered = df[
-            df[state_col].astype(str).str.contains(state, case=False, na=False)
-            & df[crop_col].astype(str).str.contains(crop, case=False, na=False)
-            & df[year_col].isin(recent_years)
-        ]
+        # Filter by state, crop and year on the arrays, then slice the frame once
+        # (recent years are the tail of the sorted years, so one comparison replaces the isin lookup)
+        rows = view.rows(state, crop)
+        rows = rows[view.years[rows] >= recent_years[0]] if recent_years else rows[:0]
 
-        if filtered.empty:
+        if not len(rows):
             return {
                 "error": f"No data found for {state}, {crop}",
                 "state": state,
@@ -676,18 +1245,17 @@ class QueryExecutor:
                 "years": years,
             }
 
-        # Aggregate by district across years (sum production for each district)
-        district_totals = (
-            filtered.groupby([district_col], as_index=False)[prod_col]
-            .sum()
-            .sort_values(prod_col, ascending=False)
-        )
+        # Year-by-year breakdown for each district, summed on the arrays in (district, year) order
+        codes, by_year, sums = view.year_breakdown(rows)
+        district_by_year = [
+            {district_col: view.districts[code], year_col: year, prod_col: total}
+            for code, year, total in zip(codes, by_year.tolist(), sums.tolist())
+        ]
 
-        # Also get year-by-year breakdown for each district
-        district_by_year = (
-            filtered.groupby([district_col, year_col], as_index=False)[prod_col]
-            .sum()
-            .sort_values([district_col, year_col])
+        # District totals across years, reduced from the breakdown rather than regrouping every row
+        district_totals = _top_group_sums(
+            pd.Series(pd.Categorical.from_codes(codes, view.districts)), pd.Series(sums),
+            len(codes), district_col, prod_col,
         )
 
         return {
@@ -695,8 +1263,30 @@ class QueryExecutor:
             "crop": crop,
             "years": int(years),
             "year_range": [int(y) for y in recent_years],
-            "districts": district_totals.to_dict(orient="records"),
-            "district_by_year": district_by_year.to_dict(orient="records"),
+            "districts": district_totals,
+            "district_by_year": district_by_year,
         }
 
-
+    # step type -> (compute method, step keys passed positionally, answer_data key)
+    _HANDLERS: Dict[str, Tuple[Callable[..., Dict[str, Any]], Tuple[str, ...], str]] = {
+        "compute_rainfall_compare": (
+            _compute_rainfall_compare, ("state1", "state2", "years"), "rainfall_compare"
+        ),
+        "compute_top_crops": (
+            _compute_top_crops, ("state1", "state2", "top_m", "crop_type"), "top_crops"
+        ),
+        "compute_district_crop_extrema": (
+            _compute_district_crop_extrema,
+            ("state_max", "crop_max", "state_min", "crop_min"),
+            "district_crop_extrema",
+        ),
+        "compute_top_crops_state": (
+            _compute_top_crops_state, ("state", "top_n", "years"), "top_crops_state"
+        ),
+        "compute_district_highest_crop_year": (
+            _compute_district_highest_crop_year, ("state", "crop", "year"), "district_highest_crop_year"
+        ),
+        "compute_district_crop_comparison": (
+            _compute_district_crop_comparison, ("state", "crop", "years"), "district_crop_comparison"
+        ),
+    }
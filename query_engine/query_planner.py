@@ -1,4 +1,28 @@
-from typing import Dict
+from typing import Dict, Tuple
+
+
+# intent -> steps, each (step type, parsed keys copied into the step)
+_PLANS: Dict[str, Tuple[Tuple[str, Tuple[str, ...]], ...]] = {
+    "rainfall_vs_top_crops": (
+        ("compute_rainfall_compare", ("state1", "state2", "years")),
+        ("compute_top_crops", ("state1", "state2", "top_m", "crop_type")),
+    ),
+    "rainfall_compare": (
+        ("compute_rainfall_compare", ("state1", "state2", "years")),
+    ),
+    "district_crop_extrema_compare": (
+        ("compute_district_crop_extrema", ("state_max", "crop_max", "state_min", "crop_min")),
+    ),
+    "top_crops_state": (
+        ("compute_top_crops_state", ("state", "top_n", "years")),
+    ),
+    "district_highest_crop_year": (
+        ("compute_district_highest_crop_year", ("state", "crop", "year")),
+    ),
+    "district_crop_comparison": (
+        ("compute_district_crop_comparison", ("state", "crop", "years")),
+    ),
+}
 
 
 class QueryPlanner:
@@ -7,98 +31,14 @@ class QueryPlanner:
 
     def plan_and_execute(self, parsed: Dict):
         intent = parsed.get("intent")
-        if intent == "rainfall_vs_top_crops":
-            plan = {
-                "intent": intent,
-                "steps": [
-                    {
-                        "type": "compute_rainfall_compare",
-                        "state1": parsed["state1"],
-                        "state2": parsed["state2"],
-                        "years": parsed["years"],
-                    },
-                    {
-                        "type": "compute_top_crops",
-                        "state1": parsed["state1"],
-                        "state2": parsed["state2"],
-                        "top_m": parsed["top_m"],
-                        "crop_type": parsed["crop_type"],
-                    },
-                ],
-            }
-            return self.executor.execute(plan)
-
-        if intent == "rainfall_compare":
-            plan = {
-                "intent": intent,
-                "steps": [
-                    {
-                        "type": "compute_rainfall_compare",
-                        "state1": parsed["state1"],
-                        "state2": parsed["state2"],
-                        "years": parsed["years"],
-                    }
-                ],
-            }
-            return self.executor.execute(plan)
-
-        if intent == "district_crop_extrema_compare":
-            plan = {
-                "intent": intent,
-                "steps": [
-                    {
-                        "type": "compute_district_crop_extrema",
-                        "state_max": parsed["state_max"],
-                        "crop_max": parsed["crop_max"],
-                        "state_min": parsed["state_min"],
-                        "crop_min": parsed["crop_min"],
-                    }
-                ],
-            }
-            return self.executor.execute(plan)
-
-        if intent == "top_crops_state":
-            plan = {
-                "intent": intent,
-                "steps": [
-                    {
-                        "type": "compute_top_crops_state",
-                        "state": parsed["state"],
-                        "top_n": parsed["top_n"],
-                        "years": parsed["years"],
-                    }
-                ],
-            }
-            return self.executor.execute(plan)
-
-        if intent == "district_highest_crop_year":
-            plan = {
-                "intent": intent,
-                "steps": [
-                    {
-                        "type": "compute_district_highest_crop_year",
-                        "state": parsed["state"],
-                        "crop": parsed["crop"],
-                        "year": parsed["year"],
-                    }
-                ],
-            }
-            return self.executor.execute(plan)
-
-        if intent == "district_crop_comparison":
-            plan = {
-                "intent": intent,
-                "steps": [
-                    {
-                        "type": "compute_district_crop_comparison",
-                        "state": parsed["state"],
-                        "crop": parsed["crop"],
-                        "years": parsed["years"],
-                    }
-                ],
-            }
-            return self.executor.execute(plan)
-
-        return self.executor.execute({"intent": intent, "steps": ["demo-step"]})
-
-
+        steps = _PLANS.get(intent)
+        if steps is None:
+            return self.executor.execute({"intent": intent, "steps": ["demo-step"]})
+        plan = {
+            "intent": intent,
+            "steps": [
+                {"type": step_type, **{key: parsed[key] for key in keys}}
+                for step_type, keys in steps
+            ],
+        }
+        return self.executor.execute(plan)
@@ -0,0 +1,529 @@
+"""Regression tests: the optimized executor, caches, snapshots and parser against plain pandas/baseline behaviour.
+
+The reference functions below are the original pandas implementations of
+each computation (`astype(str).str.contains(..., na=False)` filters and
+groupby sums), trimmed to the fields compared. The executor must agree
+with them on frames with missing, blank and whitespace-padded names,
+with and without Polars, and whether the store keeps Arrow tables,
+DataFrames or a reloaded parquet snapshot.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_processing.data_store as data_store_module
+import query_engine.query_executor as qe
+from config import get_config
+from data_processing.data_store import DataStore
+from query_engine.query_parser import QueryParser
+from utils import cache as cache_module
+from utils.cache import TTLCache, ttl_cache
+
+
+_STATES = ["Punjab", " Punjab ", "Bihar", "Karnataka", "", "  ", None]
+_CROPS = ["Rice", "Wheat ", " Rice", "Sugarcane", "", " ", None]
+_DISTRICTS = ["D1", " D1", "D2", "D3", None]
+_YEARS = ["2010", "2011", "2012", None]
+
+# (state, crop) needles; "n", "a" and "na" are inside "nan", which missing names must never match
+_NEEDLES = [("punjab", "rice"), ("a", "n"), ("na", "a"), ("bihar", "wheat"), ("kar", "sugar"), ("zz", "rice")]
+
+_CROP_RESOURCE_ID = "crop"
+
+
+@pytest.fixture(autouse=True)
+def _config(monkeypatch):
+    """No disk cache or API discovery: everything is served from the test's DataStore."""
+    monkeypatch.setenv("DATA_GOV_IN_API_KEY", "test-key")
+    monkeypatch.setenv("DATA_CACHE_TTL", "0")
+    monkeypatch.setenv("CROP_PRODUCTION_RESOURCE_ID", _CROP_RESOURCE_ID)
+    monkeypatch.setattr(qe, "DataGovInClient", None)
+    get_config.cache_clear()
+    yield
+    get_config.cache_clear()
+
+
+def _production(rng, n):
+    # Distinct values, so rankings have no ties; some unparseable or missing
+    values = np.round(rng.random(n) * 100, 3).astype(str).astype(object)
+    values[rng.random(n) < 0.1] = "x"
+    values[rng.random(n) < 0.1] = None
+    return values
+
+
+def _pick(rng, values, n):
+    return rng.choice(np.array(values, dtype=object), n)
+
+
+def _district_frame(seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(5, 200))
+    return pd.DataFrame({
+        "State_Name": _pick(rng, _STATES, n),
+        "District_Name": _pick(rng, _DISTRICTS, n),
+        "Crop": _pick(rng, _CROPS, n),
+        "Year": _pick(rng, _YEARS, n),
+        "Production": _production(rng, n),
+    })
+
+
+def _major_frame(seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed + 10_000)
+    n = int(rng.integers(5, 200))
+    return pd.DataFrame({
+        "State": _pick(rng, _STATES, n),
+        "Crop": _pick(rng, _CROPS, n),
+        "Year": _pick(rng, _YEARS, n),
+        "Production": _production(rng, n),
+    })
+
+
+# -------- Baseline pandas implementations --------
+
+def _ref_contains(series: pd.Series, needle: str) -> pd.Series:
+    return series.astype(str).str.contains(needle, case=False, na=False)
+
+
+def _ref_numeric(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df["Production"] = pd.to_numeric(df["Production"], errors="coerce")
+    df["Year"] = pd.to_numeric(df["Year"], errors="coerce")
+    return df
+
+
+def _ref_top_crops_state(df: pd.DataFrame, state_col: str, state: str, top_n: int, years: int) -> dict:
+    df = _ref_numeric(df)
+    filtered = df[_ref_contains(df[state_col], state)].copy()
+    if filtered.empty:
+        return {"error": f"No data found for {state}"}
+    all_years = sorted(filtered["Year"].dropna().unique())
+    recent_years = all_years[-years:] if len(all_years) >= years else all_years
+    filtered = filtered[filtered["Year"].isin(recent_years)]
+    if filtered.empty:
+        return {"error": f"No data found for {state} in recent {years} years"}
+    filtered = filtered.dropna(subset=["Crop", "Production"])
+    filtered["Crop"] = filtered["Crop"].astype(str).str.strip()
+    filtered = filtered[filtered["Crop"] != ""]
+    if filtered.empty:
+        return {"error": f"No valid crop data found for {state} in recent {years} years"}
+    top = filtered.groupby("Crop", as_index=False)["Production"].sum().sort_values("Production", ascending=False).head(top_n)
+    return {"crops": top.to_dict(orient="records"), "year_range": [int(y) for y in recent_years]}
+
+
+def _ref_top_crops(df: pd.DataFrame, state1: str, state2: str, top_m: int, crop_type: str) -> dict:
+    df = _ref_numeric(df)
+    out = {}
+    for s in [state1, state2]:
+        s_df = df[_ref_contains(df["State"], s)]
+        if crop_type:
+            s_df = s_df[_ref_contains(s_df["Crop"], crop_type)]
+        top = s_df.groupby("Crop", as_index=False)["Production"].sum().sort_values("Production", ascending=False).head(top_m)
+        out[s] = top.to_dict(orient="records")
+    return out
+
+
+def _ref_district_highest_crop_year(df: pd.DataFrame, state: str, crop: str, year: int) -> dict:
+    df = _ref_numeric(df)
+    filtered = df[_ref_contains(df["State_Name"], state) & _ref_contains(df["Crop"], crop) & (df["Year"] == year)]
+    if filtered.empty:
+        return {"error": f"No data found for {state}, {crop}, year {year}"}
+    grouped = filtered.groupby("District_Name", as_index=False)["Production"].sum()
+    max_row = grouped.loc[grouped["Production"].idxmax()]
+    return {"district": str(max_row["District_Name"]), "production": float(max_row["Production"])}
+
+
+def _ref_district_crop_comparison(df: pd.DataFrame, state: str, crop: str, years: int) -> dict:
+    df = _ref_numeric(df)
+    all_years = sorted(df["Year"].dropna().unique())
+    recent_years = all_years[-years:] if len(all_years) >= years else all_years
+    filtered = df[_ref_contains(df["State_Name"], state) & _ref_contains(df["Crop"], crop) & df["Year"].isin(recent_years)]
+    if filtered.empty:
+        return {"error": f"No data found for {state}, {crop}"}
+    totals = filtered.groupby(["District_Name"], as_index=False)["Production"].sum().sort_values("Production", ascending=False)
+    by_year = filtered.groupby(["District_Name", "Year"], as_index=False)["Production"].sum().sort_values(["District_Name", "Year"])
+    return {
+        "year_range": [int(y) for y in recent_years],
+        "districts": totals.to_dict(orient="records"),
+        "district_by_year": by_year.to_dict(orient="records"),
+    }
+
+
+def _ref_extrema(df: pd.DataFrame, state: str, crop: str, mode: str):
+    df = _ref_numeric(df)
+    sub = df[_ref_contains(df["State_Name"], state) & _ref_contains(df["Crop"], crop)]
+    if sub.empty:
+        return None
+    years = sorted(sub["Year"].dropna().unique())
+    if not years:
+        return None
+    sub_recent = sub[sub["Year"] == years[-1]]
+    grouped = sub_recent.groupby("District_Name", as_index=False)["Production"].sum().sort_values("Production", ascending=(mode == "min"))
+    row = grouped.iloc[0]
+    return {"district": str(row["District_Name"]), "year": int(years[-1]), "production": float(row["Production"])}
+
+
+# -------- Comparison helpers --------
+
+def _normalized(obj):
+    """JSON-shaped copy with floats rounded (summation order differs from pandas' compensated sums)."""
+    if isinstance(obj, dict):
+        return {str(k): _normalized(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_normalized(v) for v in obj]
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float):
+        return None if obj != obj else round(obj, 6)
+    return obj
+
+
+def _subset(result: dict, expected: dict) -> dict:
+    """The fields of `result` the reference computes (errors compare by message only)."""
+    return {key: result.get(key) for key in expected}
+
+
+def _reference(fn, *args):
+    """The baseline result, or None where the baseline itself crashed (e.g. idxmax with every district missing)."""
+    try:
+        return fn(*args)
+    except (IndexError, KeyError, ValueError, TypeError):
+        return None
+
+
+def _executor(district, major, storage, tmp_path, monkeypatch):
+    if storage == "dataframe":
+        monkeypatch.setattr(data_store_module, "pa", None)
+    store = DataStore()
+    if district is not None:
+        store.add_dataset("agriculture", "crop_production_district_season", district.copy(), {"id": "d"})
+    store.add_dataset("agriculture", "crop_production_major_crops", major.copy(), {"id": "m"})
+    if storage == "snapshot":
+        assert store.save_snapshot(str(tmp_path))
+        store = DataStore.load_snapshot(str(tmp_path), 3600)
+        assert store is not None
+    executor = qe.QueryExecutor(store)
+
+    def fetch_dataset(resource_id, use_ckan=False):
+        if resource_id == _CROP_RESOURCE_ID:
+            return major.copy()
+        raise RuntimeError(f"unexpected fetch of {resource_id}")
+
+    monkeypatch.setattr(executor.fetcher, "fetch_dataset", fetch_dataset)
+    return executor
+
+
+_STORAGES = ["arrow", "dataframe", "snapshot"]
+
+
+@pytest.fixture(params=[True, False], ids=["polars", "pandas"])
+def use_polars(request, monkeypatch):
+    if request.param and qe.pl is None:
+        pytest.skip("polars not installed")
+    if not request.param:
+        monkeypatch.setattr(qe, "pl", None)
+    return request.param
+
+
+# -------- Executor vs baseline --------
+
+@pytest.mark.parametrize("storage", _STORAGES)
+@pytest.mark.parametrize("seed", range(12))
+def test_district_computations_match_baseline(seed, storage, use_polars, tmp_path, monkeypatch):
+    district = _district_frame(seed)
+    executor = _executor(district, _major_frame(seed), storage, tmp_path, monkeypatch)
+    for state, crop in _NEEDLES:
+        for year in (2010, 2012):
+            expected = _reference(_ref_district_highest_crop_year, district, state, crop, year)
+            if expected is not None:
+                result = executor._compute_district_highest_crop_year(state, crop, year)
+                assert _normalized(_subset(result, expected)) == _normalized(expected), (state, crop, year)
+        for years in (1, 2, 5):
+            expected = _ref_district_crop_comparison(district, state, crop, years)
+            result = executor._compute_district_crop_comparison(state, crop, years)
+            assert _normalized(_subset(result, expected)) == _normalized(expected), (state, crop, years)
+
+    for (state_max, crop_max), (state_min, crop_min) in zip(_NEEDLES, reversed(_NEEDLES)):
+        expected_max = _reference(_ref_extrema, district, state_max, crop_max, "max")
+        expected_min = _reference(_ref_extrema, district, state_min, crop_min, "min")
+        result = executor._compute_district_crop_extrema(state_max, crop_max, state_min, crop_min)
+        for side, expected in (("max", expected_max), ("min", expected_min)):
+            got = result[side]
+            if expected is None:
+                continue
+            assert _normalized(_subset(got, expected)) == _normalized(expected), (side, result)
+
+
+@pytest.mark.parametrize("storage", _STORAGES)
+@pytest.mark.parametrize("seed", range(12))
+def test_top_crops_state_matches_baseline(seed, storage, use_polars, tmp_path, monkeypatch):
+    # With a district table the state query reads it; without one, the major-crops table
+    district, major = _district_frame(seed), _major_frame(seed)
+    for source, state_col in ((district, "State_Name"), (None, "State")):
+        executor = _executor(source, major, storage, tmp_path / state_col, monkeypatch)
+        frame = district if source is not None else major
+        for state, _ in _NEEDLES:
+            for top_n, years in ((3, 2), (10, 5)):
+                expected = _ref_top_crops_state(frame, state_col, state, top_n, years)
+                result = executor._compute_top_crops_state(state, top_n, years)
+                assert _normalized(_subset(result, expected)) == _normalized(expected), (state, top_n, years)
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_top_crops_match_baseline(seed, use_polars, tmp_path, monkeypatch):
+    major = _major_frame(seed)
+    executor = _executor(_district_frame(seed), major, "arrow", tmp_path, monkeypatch)
+    for (state1, crop_type), (state2, _) in zip(_NEEDLES, reversed(_NEEDLES)):
+        for crop in (crop_type, ""):
+            expected = _ref_top_crops(major, state1, state2, 3, crop)
+            result = executor._compute_top_crops(state1, state2, 3, crop)
+            assert _normalized(result) == _normalized(expected), (state1, state2, crop)
+
+
+def test_missing_names_never_match(use_polars, tmp_path, monkeypatch):
+    """A missing name renders as "nan" under old astype(str); needles inside "nan" must not count it."""
+    district = pd.DataFrame({
+        "State_Name": ["Punjab", None, "Punjab"],
+        "District_Name": ["D1", "D2", "D3"],
+        "Crop": ["Wheat", "Rice", None],
+        "Year": ["2011", "2011", "2011"],
+        "Production": ["1", "5", "7"],
+    })
+    major = pd.DataFrame({"State": ["Punjab", None], "Crop": ["Wheat", None], "Year": ["2011", "2011"], "Production": ["3", "4"]})
+    executor = _executor(district, major, "arrow", tmp_path, monkeypatch)
+    assert "error" in executor._compute_district_crop_comparison("a", "n", 3)
+    assert "error" in executor._compute_district_highest_crop_year("na", "a", 2011)
+    assert executor._compute_top_crops("na", "punjab", 3, "n") == {"na": [], "punjab": []}
+
+    executor = _executor(None, major, "arrow", tmp_path / "major", monkeypatch)
+    assert executor._compute_top_crops_state("na", 3, 3)["error"] == "No data found for na"
+
+
+def test_district_arrays_reused_only_for_their_frame(tmp_path, monkeypatch):
+    executor = _executor(_district_frame(0), _major_frame(0), "arrow", tmp_path, monkeypatch)
+    df = executor._load_district_crop_production()
+    schema = qe._resolve_schema(df)
+    assert executor._district_view(df, schema) is executor._district_arrays
+    other = df.copy()
+    other["Production"] = other["Production"].to_numpy()[::-1].copy()
+    assert executor._district_view(other, schema) is not executor._district_arrays
+
+
+# -------- District arrays and kernels --------
+
+@pytest.mark.parametrize("seed", range(8))
+def test_district_arrays_rows_grouped_by_pair(seed):
+    df = _district_frame(seed)
+    df["Production"] = pd.to_numeric(df["Production"], errors="coerce")
+    df["Year"] = pd.to_numeric(df["Year"], errors="coerce")
+    schema = qe._resolve_schema(df)
+    view = qe.DistrictArrays.from_frame(qe._with_categorical_names(df), schema)
+    assert view.pair_offsets[0] == 0 and view.pair_offsets[-1] == len(df)
+    assert np.all(np.diff(view.pair_offsets) >= 0)
+    for state, crop in _NEEDLES:
+        rows = view.rows(state, crop)
+        assert np.all(np.diff(rows) > 0)
+        expected = df.loc[_ref_contains(df["State_Name"], state) & _ref_contains(df["Crop"], crop), "Production"]
+        np.testing.assert_array_equal(
+            np.sort(view.production[rows].astype(np.float64)), np.sort(expected.to_numpy(dtype=np.float64))
+        )
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_accumulate_kernels_match_loops(seed):
+    rng = np.random.default_rng(seed)
+    n, n_codes, n_years = 300, 7, 4
+    codes = rng.integers(-1, n_codes, n)
+    years = rng.choice([2010.0, 2011.0, np.nan], n)
+    values = rng.random(n)
+    values[rng.random(n) < 0.2] = np.nan
+    rows = np.sort(rng.choice(n, 150, replace=False))
+
+    sums, counts = np.zeros(n_codes), np.zeros(n_codes, dtype=np.int64)
+    qe._accumulate_year(rows, codes, years, values, 2011.0, sums, counts)
+    want_sums, want_counts = np.zeros(n_codes), np.zeros(n_codes, dtype=np.int64)
+    for i in rows:
+        if codes[i] >= 0 and years[i] == 2011.0:
+            want_counts[codes[i]] += 1
+            want_sums[codes[i]] += 0.0 if np.isnan(values[i]) else values[i]
+    np.testing.assert_allclose(sums, want_sums)
+    np.testing.assert_array_equal(counts, want_counts)
+
+    year_codes = rng.integers(-1, n_years, n)
+    sums, counts = np.zeros(n_codes * n_years), np.zeros(n_codes * n_years, dtype=np.int64)
+    qe._accumulate_grid(codes, year_codes, values, n_years, sums, counts)
+    want_sums, want_counts = np.zeros(n_codes * n_years), np.zeros(n_codes * n_years, dtype=np.int64)
+    for code, year_code, value in zip(codes, year_codes, values):
+        if code >= 0 and year_code >= 0:
+            want_counts[code * n_years + year_code] += 1
+            want_sums[code * n_years + year_code] += 0.0 if np.isnan(value) else value
+    np.testing.assert_allclose(sums, want_sums)
+    np.testing.assert_array_equal(counts, want_counts)
+
+
+# -------- Caches --------
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock.monotonic)
+    return clock
+
+
+def test_ttl_cache_expiry_and_per_entry_ttl(clock):
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=1)
+    clock.now += 5
+    assert cache.get("a") == 1 and "b" not in cache
+    cache.set("c", 3)
+    cache.set("d", 4)
+    assert "a" not in cache and cache.get("d") == 4
+    clock.now += 11
+    assert cache.get("c") is None
+
+
+def test_ttl_cache_none_ttl(clock):
+    calls = []
+
+    def lookup(value):
+        calls.append(value)
+        return value
+
+    forever = ttl_cache(ttl=3600)(lookup)
+    short = ttl_cache(ttl=3600, none_ttl=60)(lookup)
+    never = ttl_cache(ttl=3600, none_ttl=0)(lookup)
+
+    for fn in (forever, short, never):
+        calls.clear()
+        fn(None)
+        fn(None)
+        fn("x")
+        fn("x")
+        assert calls == ([None, "x"] if fn is not never else [None, None, "x"])
+
+    calls.clear()
+    clock.now += 61
+    forever(None)
+    short(None)
+    short("x")
+    assert calls == [None]
+
+
+# -------- Snapshots --------
+
+def test_snapshot_round_trip_and_config(tmp_path):
+    if data_store_module.pq is None:
+        pytest.skip("pyarrow not installed")
+    assert not DataStore().save_snapshot(str(tmp_path))
+    assert not (tmp_path / "index.json").exists()
+
+    store = DataStore()
+    store.add_dataset("agriculture", "crop_production_district_season", _district_frame(1), {"id": "d"})
+    config = {"has_api_key": True, "rainfall_resource_id": None}
+    assert store.save_snapshot(str(tmp_path), config)
+    index = json.loads((tmp_path / "index.json").read_text())
+    assert index["config"] == config
+    assert index["agriculture"] == {"crop_production_district_season": "agriculture__crop_production_district_season.parquet"}
+
+    loaded = DataStore.load_snapshot(str(tmp_path), 3600, config)
+    assert loaded is not None and loaded.metadata == {"crop_production_district_season": {"id": "d"}}
+    pd.testing.assert_frame_equal(
+        loaded.get_dataset("crop_production_district_season").astype(object),
+        store.get_dataset("crop_production_district_season").astype(object),
+    )
+    assert DataStore.load_snapshot(str(tmp_path), 3600, {**config, "has_api_key": False}) is None
+    assert DataStore.load_snapshot(str(tmp_path), 3600) is None
+
+    stale = os.path.getmtime(tmp_path / "index.json") - 7200
+    os.utime(tmp_path / "index.json", (stale, stale))
+    assert DataStore.load_snapshot(str(tmp_path), 3600, config) is None
+
+
+@pytest.mark.parametrize("storage", ["arrow", "dataframe"])
+def test_get_dataset_unknown_column_raises(storage, monkeypatch):
+    if storage == "dataframe":
+        monkeypatch.setattr(data_store_module, "pa", None)
+    store = DataStore()
+    store.add_dataset("agriculture", "t", pd.DataFrame({"a": [1], "b": ["x"]}), {})
+    assert list(store.get_dataset("t", ["a"]).columns) == ["a"]
+    with pytest.raises(KeyError):
+        store.get_dataset("t", ["a", "missing"])
+
+
+# -------- Parser --------
+
+@pytest.mark.parametrize("question, expected", [
+    (
+        "Compare the average annual rainfall in Karnataka and Punjab for the last 5 years and list the top 3 most produced crops of Cereals in each",
+        {"intent": "rainfall_vs_top_crops", "state1": "Karnataka", "state2": "Punjab", "years": 5, "top_m": 3, "crop_type": "Cereals"},
+    ),
+    (
+        "Compare the average annual rainfall in Karnataka and Punjab for the last 5 years and list the top 3 most produced crops of "
+        + "very long crop category name " * 4 + "in each",
+        {"intent": "rainfall_vs_top_crops", "state1": "Karnataka", "state2": "Punjab", "years": 5, "top_m": 3,
+         "crop_type": " ".join(["very long crop category name"] * 4)},
+    ),
+    (
+        "average annual rainfall of Karnataka vs Punjab over the last 4 years",
+        {"intent": "rainfall_compare", "state1": "karnataka", "state2": "punjab", "years": 4},
+    ),
+    (
+        "compare rainfall in Karnatak and Tamil Nadu for the last 3 years",
+        {"intent": "rainfall_compare", "state1": "karnataka", "state2": "Tamil Nadu", "years": 3},
+    ),
+    (
+        "compare rainfall between Bihar and Odisha",
+        {"intent": "rainfall_compare", "state1": "Bihar", "state2": "odisha", "years": 5},
+    ),
+    (
+        "Identify the district in Punjab with the highest production of Wheat in the most recent year and compare that with the district with the lowest production of Rice in Bihar?",
+        {"intent": "district_crop_extrema_compare", "state_max": "Punjab", "crop_max": "Wheat", "state_min": "Bihar", "crop_min": "Rice"},
+    ),
+    (
+        "List the top 5 crops produced in Karnataka during the last 3 years",
+        {"intent": "top_crops_state", "state": "Karnataka", "top_n": 5, "years": 3},
+    ),
+    (
+        "Which district in Karnataka had the highest Rice production in 2010?",
+        {"intent": "district_highest_crop_year", "state": "Karnataka", "crop": "Rice", "year": 2010},
+    ),
+    (
+        "Which district highest rice in Tamil Nadu in 2012?",
+        {"intent": "district_highest_crop_year", "state": "Tamil Nadu", "crop": "rice", "year": 2012},
+    ),
+    (
+        "Compare Rice production across all districts in Karnataka for the last 3 years.",
+        {"intent": "district_crop_comparison", "state": "Karnataka", "crop": "Rice", "years": 3},
+    ),
+])
+def test_parser_patterns(question, expected):
+    assert QueryParser(None).parse_query(question, {}) == expected
+
+
+@pytest.mark.parametrize("question", [
+    "List the top 3 crops produced in   during the last 2 years",
+    "compare rainfall in   and Kerala",
+    "hello there",
+])
+def test_parser_rejects_blank_states(question):
+    parsed = QueryParser(None).parse_query(question, {})
+    assert parsed["intent"] == "unknown"
+
+
+def test_parser_returns_copies():
+    parser = QueryParser(None)
+    question = "compare rainfall between Bihar and Odisha"
+    parser.parse_query(question, {})["state1"] = "changed"
+    assert parser.parse_query(question, {})["state1"] == "Bihar"
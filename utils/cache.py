@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Hashable, Optional
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU mapping whose entries optionally expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int = 128, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Any = _MISSING) -> None:
+        """Store `value`; `ttl` overrides the cache's own TTL for this entry."""
+        ttl = self.ttl if ttl is _MISSING else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def ttl_cache(
+    maxsize: int = 128,
+    ttl: Optional[float] = None,
+    key: Optional[Callable[..., Hashable]] = None,
+    none_ttl: Any = _MISSING,
+):
+    """Memoize a function in a `TTLCache`.
+
+    `key` maps the call arguments to a cache key; by default the positional
+    and keyword arguments themselves are used, so they must be hashable.
+    `none_ttl` gives `None` results their own TTL (0 skips caching them),
+    e.g. so a failed lookup is retried soon. The wrapper exposes `.cache`
+    and `.cache_clear()`.
+    """
+
+    def decorator(fn):
+        cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            k = key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items())))
+            value = cache.get(k, _MISSING)
+            if value is _MISSING:
+                value = fn(*args, **kwargs)
+                if value is not None or none_ttl is _MISSING:
+                    cache.set(k, value)
+                elif none_ttl:
+                    cache.set(k, value, ttl=none_ttl)
+            return value
+
+        wrapper.cache = cache
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
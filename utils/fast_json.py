@@ -0,0 +1,42 @@
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib parser
+    orjson = None
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parse JSON from bytes or str, using orjson when it is installed.
+
+    Both backends raise `json.JSONDecodeError` (a `ValueError`) on bad input.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _default(obj: Any) -> Any:
+    # numpy scalars/arrays -> plain Python values; anything else by its str()
+    tolist = getattr(obj, "tolist", None)
+    if callable(tolist):
+        return tolist()
+    return str(obj)
+
+
+def dumps_canonical(obj: Any) -> bytes:
+    """Serialize with sorted keys so equal inputs always give identical bytes.
+
+    Values JSON can't represent fall back to their `str()`; if the object
+    still can't be encoded (e.g. non-string dict keys) its `repr` is used.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=_default, option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            pass
+    try:
+        return json.dumps(obj, default=_default, sort_keys=True, ensure_ascii=False).encode()
+    except (TypeError, ValueError):
+        return repr(obj).encode()
@@ -0,0 +1,150 @@
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+    import h2  # noqa: F401  (required by httpx for http2=True)
+except ImportError:  # optional: fall back to the pooled requests session
+    httpx = None
+
+
+USER_AGENT = "samarth-qa/1.0 (+https://data.gov.in)"
+
+# Transient statuses worth retrying with exponential backoff
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Never sleep longer than this for a single backoff or rate-limit pause
+MAX_BACKOFF_SECONDS = 8.0
+
+# Connection-level failures worth retrying, for whichever transport is in use
+TRANSPORT_ERRORS = (requests.RequestException,) + ((httpx.TransportError,) if httpx else ())
+
+# Failures after the connection was made, which neither transport retries itself
+# (urllib3 retries connects and read timeouts; httpx's transport only connects)
+READ_ERRORS = (requests.exceptions.ChunkedEncodingError,) + (
+    (httpx.ReadError, httpx.ReadTimeout, httpx.RemoteProtocolError) if httpx else ()
+)
+
+# A host that doesn't accept within this long is down; don't wait out the read timeout
+CONNECT_TIMEOUT_SECONDS = 5.0
+
+_shared_session: Optional[requests.Session] = None
+_shared_http2_client = None
+_shared_session_lock = threading.Lock()
+
+
+def build_session(
+    headers: Optional[Dict[str, str]] = None,
+    pool_connections: int = 4,
+    pool_maxsize: int = 20,
+    retries: int = 5,
+) -> requests.Session:
+    """Create a `requests.Session` with keep-alive pooling and retry/backoff.
+
+    Reusing one session avoids a fresh TCP+TLS handshake per call. Retries
+    return the last response once exhausted (instead of raising) so callers
+    keep their existing `resp.ok` / `raise_for_status()` handling. A
+    server-sent `Retry-After` overrides the computed backoff.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def shared_session() -> requests.Session:
+    """Process-wide pooled session, created on first use.
+
+    Every client reuses the same urllib3 pools (which are thread-safe), so
+    a new client doesn't start with a fresh TLS handshake. Pass per-client
+    headers on each request and never close this session.
+    """
+    global _shared_session
+    if _shared_session is None:
+        with _shared_session_lock:
+            if _shared_session is None:
+                _shared_session = build_session(pool_connections=8, pool_maxsize=32)
+    return _shared_session
+
+
+def shared_http2_client():
+    """Process-wide `httpx.Client` speaking HTTP/2, or None when httpx/h2 are missing.
+
+    Concurrent requests to one host are multiplexed over a single
+    connection. Unlike `shared_session()` it does not retry 429/5xx
+    responses itself; callers handle those.
+    """
+    global _shared_http2_client
+    if httpx is None:
+        return None
+    if _shared_http2_client is None:
+        with _shared_session_lock:
+            if _shared_http2_client is None:
+                # Limits must go on the transport; the client ignores them when one is given
+                transport = httpx.HTTPTransport(
+                    http2=True,
+                    limits=httpx.Limits(max_connections=8, max_keepalive_connections=8),
+                    retries=2,
+                )
+                _shared_http2_client = httpx.Client(
+                    http2=True,
+                    timeout=60,
+                    headers={"User-Agent": USER_AGENT},
+                    transport=transport,
+                )
+    return _shared_http2_client
+
+
+def request_timeout(session, read: float = 60.0):
+    """Timeout for a call on `session` (httpx or requests): a short connect phase, then `read` seconds."""
+    if httpx is not None and isinstance(session, httpx.Client):
+        return httpx.Timeout(read, connect=CONNECT_TIMEOUT_SECONDS)
+    return (CONNECT_TIMEOUT_SECONDS, read)
+
+
+def backoff_delay(attempt: int, base: float = 0.5) -> float:
+    """Exponential backoff for the given zero-based retry attempt, capped."""
+    return min(MAX_BACKOFF_SECONDS, base * (2 ** attempt))
+
+
+def rate_limit_pause(resp: requests.Response) -> float:
+    """Seconds to wait before the next call when the server says the quota is nearly spent.
+
+    Looks at `X-RateLimit-Remaining` and, when it is exhausted (or on a 429),
+    at `Retry-After` given in seconds.
+    """
+    headers = resp.headers
+    remaining = _header_number(headers.get("X-RateLimit-Remaining"))
+    if resp.status_code != 429 and (remaining is None or remaining > 1):
+        return 0.0
+    wait = _header_number(headers.get("Retry-After"))
+    if wait is None:
+        wait = backoff_delay(0)
+    return max(0.0, min(MAX_BACKOFF_SECONDS, wait))
+
+
+def _header_number(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None